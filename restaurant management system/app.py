@@ -4,11 +4,51 @@ from extensions import app, db
 # Import models to create tables
 from models import *
 
-# Import and register routes
+# Flask-Login user loader, served from an in-process cache
+import user_cache
+
 from routes import register_routes
-register_routes(app)
+from commands import register_commands
+from static_assets import init_static_assets
+from compression import init_compression
+from template_cache import init_template_cache
+
+
+def create_app():
+    """Register routes, commands and middleware on the shared app and return it.
+
+    The Flask instance itself lives in extensions.py so modules can import it;
+    this only wires it up, once, however many entry points call it. The schema
+    is managed by migrations (flask db upgrade), never created here.
+    """
+    if app.extensions.get('restaurant_app_ready'):
+        return app
+
+    # Register routes
+    register_routes(app)
+
+    # Register CLI commands (flask --app app <group> <command>)
+    register_commands(app)
+
+    # Fingerprinted static URLs with long-lived caching, and gzip/brotli responses
+    init_static_assets(app)
+    init_compression(app)
+
+    # {% cache %} fragments for list rows and a compiled-template bytecode cache
+    init_template_cache(app)
+
+    # Optional SQL instrumentation for catching N+1 regressions
+    if app.config['QUERY_PROFILING']:
+        from query_profiler import init_query_profiler
+        with app.app_context():
+            init_query_profiler(app, db.engine)
+
+    app.extensions['restaurant_app_ready'] = True
+    return app
+
+
+create_app()
 
 if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
-    app.run(debug=True)
\ No newline at end of file
+    # Development server only; see `flask --app app serve` for production
+    app.run(debug=True)
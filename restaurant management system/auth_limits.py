@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HashingBusy(Exception):
+    """Raised when the password hashing pool is saturated"""
+
+
+class PasswordHasher:
+    """Bounded pool for password hashing.
+
+    At most `workers` hashes run at once and at most `queue_size` wait or run;
+    callers beyond that are turned away instead of tying up more request threads.
+    pbkdf2 releases the GIL, so the pool's threads don't block other requests.
+    """
+
+    def __init__(self, workers, queue_size, timeout):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(queue_size)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HashingBusy()
+
+    def check(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def generate(self, password):
+        return self._run(generate_password_hash, password)
+
+
+_hasher_lock = threading.Lock()
+_hasher = None
+
+
+def get_hasher():
+    """The process's hashing pool, created on first use so forked workers each get their own"""
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                config = current_app.config
+                _hasher = PasswordHasher(
+                    config['PASSWORD_HASH_WORKERS'], config['PASSWORD_HASH_QUEUE'], config['PASSWORD_HASH_TIMEOUT']
+                )
+    return _hasher
+
+
+def parse_rate(value):
+    """'5/60' -> (5 attempts, refilled over 60 seconds)"""
+    attempts, seconds = value.split('/')
+    return int(attempts), float(seconds)
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets, keeping at most `max_keys` buckets (least recently used dropped)"""
+
+    def __init__(self, capacity, period, max_keys=10000):
+        self.capacity = capacity
+        self.refill_rate = capacity / period
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+
+    def consume(self, key):
+        """Take one token; returns 0 if allowed, otherwise seconds until a token is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.refill_rate)
+            if tokens >= 1:
+                retry_after = 0
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / self.refill_rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+_limiters_lock = threading.Lock()
+_limiters = {}
+
+
+def _limiter(name):
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                limiter = TokenBucketLimiter(*parse_rate(current_app.config[name]))
+                _limiters[name] = limiter
+    return limiter
+
+
+def login_retry_after(ip, username):
+    """Charge a login attempt to the client IP and the username.
+
+    Returns 0 when the attempt may proceed, otherwise the seconds to wait.
+    Buckets are per process, so with several workers the effective limit is
+    that many times higher.
+    """
+    retry_after = _limiter('LOGIN_RATE_PER_IP').consume(ip or 'unknown')
+    if username:
+        retry_after = max(retry_after, _limiter('LOGIN_RATE_PER_USERNAME').consume(username.strip().lower()))
+    return retry_after
@@ -0,0 +1,228 @@
+import contextvars
+import json
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import event, insert, select
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models import Customer, MenuItem, Order, OrderItem, Table, User
+
+BENCH_USERNAME = 'bench'
+BENCH_PASSWORD = 'bench-password'
+DEFAULT_SIZES = (1000, 10000)
+DEFAULT_REQUESTS = 50
+INSERT_CHUNK = 5000
+# Timings below this many milliseconds of drift are treated as noise
+P95_SLACK_MS = 2.0
+
+CATEGORIES = ('appetizer', 'main', 'dessert', 'beverage')
+ORDER_STATUS_WEIGHTS = (('completed', 70), ('cancelled', 5), ('served', 5), ('preparing', 10), ('pending', 10))
+
+
+def _chunked_insert(model, rows):
+    for start in range(0, len(rows), INSERT_CHUNK):
+        db.session.execute(insert(model), rows[start:start + INSERT_CHUNK])
+
+
+def seed(orders, seed_value=42):
+    """Fill an empty database with synthetic data scaled to the number of orders.
+
+    Tables, menu items and customers grow with the order count the way a busier
+    restaurant's would. Rows are written with chunked executemany INSERTs.
+    """
+    rng = random.Random(seed_value)
+    table_count = max(10, min(200, orders // 50))
+    menu_count = 100
+    customer_count = max(20, orders // 5)
+    now = datetime.utcnow()
+
+    db.session.add(User(
+        username=BENCH_USERNAME,
+        email='bench@example.com',
+        password_hash=generate_password_hash(BENCH_PASSWORD),
+        role='admin'
+    ))
+    db.session.flush()
+    user_id = db.session.scalar(select(User.id).where(User.username == BENCH_USERNAME))
+
+    _chunked_insert(Table, [{
+        'table_number': n,
+        'capacity': rng.choice((2, 4, 4, 6, 8)),
+        'status': 'available'
+    } for n in range(1, table_count + 1)])
+    _chunked_insert(MenuItem, [{
+        'name': f'Item {n}',
+        'description': f'Synthetic menu item {n}',
+        'price': Decimal(rng.randint(200, 4000)) / 100,
+        'category': CATEGORIES[n % len(CATEGORIES)],
+        'available': rng.random() > 0.1,
+        'created_at': now
+    } for n in range(1, menu_count + 1)])
+    _chunked_insert(Customer, [{
+        'name': f'Customer {n}',
+        'email': f'customer{n}@example.com',
+        'phone': f'555{n:07d}',
+        'created_at': now - timedelta(days=rng.randint(0, 365))
+    } for n in range(1, customer_count + 1)])
+
+    table_ids = db.session.scalars(select(Table.id)).all()
+    customer_ids = db.session.scalars(select(Customer.id)).all()
+    prices = dict(db.session.execute(select(MenuItem.id, MenuItem.price)).all())
+    menu_ids = list(prices)
+    statuses = [status for status, _ in ORDER_STATUS_WEIGHTS]
+    weights = [weight for _, weight in ORDER_STATUS_WEIGHTS]
+
+    order_rows, lines = [], []
+    for _ in range(orders):
+        created_at = now - timedelta(minutes=rng.randint(0, 90 * 24 * 60))
+        order_lines = [(rng.choice(menu_ids), rng.randint(1, 3)) for _ in range(rng.randint(1, 5))]
+        lines.append((created_at, order_lines))
+        order_rows.append({
+            'table_id': rng.choice(table_ids),
+            'user_id': user_id,
+            'customer_id': rng.choice(customer_ids) if rng.random() > 0.3 else None,
+            'status': rng.choices(statuses, weights)[0],
+            'total_amount': sum(prices[m] * q for m, q in order_lines),
+            'created_at': created_at,
+            'updated_at': created_at
+        })
+    _chunked_insert(Order, order_rows)
+
+    order_ids = db.session.scalars(select(Order.id).order_by(Order.id)).all()
+    item_rows = [{
+        'order_id': order_id,
+        'menu_item_id': menu_item_id,
+        'quantity': quantity,
+        'price': prices[menu_item_id],
+        'status': 'served',
+        'created_at': created_at
+    } for order_id, (created_at, order_lines) in zip(order_ids, lines) for menu_item_id, quantity in order_lines]
+    _chunked_insert(OrderItem, item_rows)
+    db.session.commit()
+
+    return {
+        'tables': table_count,
+        'menu_items': menu_count,
+        'customers': customer_count,
+        'orders': orders,
+        'order_items': len(item_rows)
+    }
+
+
+def reset_database():
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+
+
+def _percentile(values, pct):
+    # Nearest-rank percentile
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)]
+
+
+def _endpoints(rng, table_ids, menu_ids):
+    def new_ticket():
+        return {
+            'table_id': rng.choice(table_ids),
+            'items': [{'menu_item_id': rng.choice(menu_ids), 'quantity': rng.randint(1, 3)} for _ in range(3)]
+        }
+
+    return [
+        ('GET /dashboard', lambda client: client.get('/dashboard')),
+        ('GET /orders', lambda client: client.get('/orders')),
+        ('GET /api/menu', lambda client: client.get('/api/menu')),
+        ('POST /api/orders', lambda client: client.post('/api/orders', json=new_ticket())),
+    ]
+
+
+def measure(app, requests=DEFAULT_REQUESTS, warmup=3, seed_value=42):
+    """Time each benchmarked endpoint and count the SQL statements it issues per request"""
+    rng = random.Random(seed_value)
+    table_ids = db.session.scalars(select(Table.id)).all()
+    menu_ids = db.session.scalars(select(MenuItem.id).where(MenuItem.available.is_(True))).all()
+    engine = db.engine
+    db.session.remove()
+    # Run the requests in an empty context so each one pushes its own app context
+    # and database session, as under a real server, instead of sharing the CLI's
+    return contextvars.Context().run(_timed_requests, app, engine, _endpoints(rng, table_ids, menu_ids), requests, warmup)
+
+
+def _timed_requests(app, engine, endpoints, requests, warmup):
+    counter = {'queries': 0}
+
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        counter['queries'] += 1
+
+    client = app.test_client()
+    response = client.post('/login', data={'username': BENCH_USERNAME, 'password': BENCH_PASSWORD})
+    if response.status_code != 302:
+        raise RuntimeError('Could not log in as the benchmark user')
+
+    results = {}
+    event.listen(engine, 'before_cursor_execute', count_query)
+    try:
+        for name, call in endpoints:
+            for _ in range(warmup):
+                call(client)
+            timings, queries = [], []
+            for _ in range(requests):
+                counter['queries'] = 0
+                start = time.perf_counter()
+                response = call(client)
+                timings.append((time.perf_counter() - start) * 1000)
+                queries.append(counter['queries'])
+                if response.status_code >= 400:
+                    raise RuntimeError(f'{name} answered {response.status_code}')
+            results[name] = {
+                'p50_ms': round(_percentile(timings, 50), 2),
+                'p95_ms': round(_percentile(timings, 95), 2),
+                'max_ms': round(max(timings), 2),
+                'queries_avg': round(sum(queries) / len(queries), 2),
+                'queries_max': max(queries)
+            }
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_query)
+    return results
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, baseline):
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare(results, baseline, tolerance=None):
+    """List regressions of `results` against `baseline` for one database and size.
+
+    Query counts are deterministic and must not grow at all. p95 latency is
+    only checked when `tolerance` (a fraction) is given, since the baseline
+    timings come from whichever machine recorded them; it may then drift by
+    the tolerance plus P95_SLACK_MS before it counts.
+    """
+    regressions = []
+    for name, current in results.items():
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        if current['queries_max'] > expected['queries_max']:
+            regressions.append(f"{name}: {current['queries_max']} queries per request, baseline {expected['queries_max']}")
+        if tolerance is None:
+            continue
+        limit = expected['p95_ms'] * (1 + tolerance) + P95_SLACK_MS
+        if current['p95_ms'] > limit:
+            regressions.append(f"{name}: p95 {current['p95_ms']} ms, baseline {expected['p95_ms']} ms (limit {limit:.2f} ms)")
+    return regressions
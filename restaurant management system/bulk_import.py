@@ -0,0 +1,306 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from werkzeug.datastructures import MultiDict
+
+from extensions import db
+from forms import CustomerForm, MenuItemForm
+from models import Customer, MenuItem
+from menu_cache import bump_menu_version
+from customer_search import reset_index
+
+IMPORT_KINDS = ('customers', 'menu')
+IMPORT_FORMATS = ('csv', 'json', 'jsonl')
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000  # per upload response; the CLI prints them all
+FALSE_VALUES = ('0', 'false', 'no', 'n', 'off')
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+class CustomerImportForm(CustomerForm):
+    class Meta:
+        csrf = False
+
+    def validate_email(self, email):
+        # An email already on file updates that customer instead of failing the row
+        pass
+
+
+class MenuItemImportForm(MenuItemForm):
+    class Meta:
+        csrf = False
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.errors = []  # {'row': n, 'errors': {field: [messages]}}, rows numbered from 1
+
+    def error(self, row, field, message):
+        self.errors.append({'row': row, 'errors': {field: [message]}})
+
+    def to_dict(self, max_errors=None):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'updated': self.updated,
+            'failed': len(self.errors),
+            'errors': self.errors[:max_errors]
+        }
+
+
+def detect_format(filename, default='csv'):
+    """Guess the format from a file name's extension"""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in (filename or '') else ''
+    return extension if extension in IMPORT_FORMATS else default
+
+
+def iter_records(stream, import_format):
+    """Yield one dict per record from a binary stream.
+
+    CSV and JSON Lines are read a line at a time; a JSON document must be a
+    top-level array and is parsed whole.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if import_format == 'csv':
+        reader = csv.DictReader(text)
+        try:
+            for record in reader:
+                yield {key.strip(): value for key, value in record.items() if key}
+        except csv.Error as e:
+            # line_num counts the lines read before the one being parsed when it failed
+            raise ImportFormatError(f'CSV error on line {reader.line_num + 1}: {e}')
+    elif import_format == 'jsonl':
+        for line in text:
+            if line.strip():
+                yield _json_record(json.loads(line))
+    elif import_format == 'json':
+        records = json.load(text)
+        if not isinstance(records, list):
+            raise ImportFormatError('A JSON import must be an array of objects')
+        for record in records:
+            yield _json_record(record)
+    else:
+        raise ImportFormatError(f'format must be one of {", ".join(IMPORT_FORMATS)}')
+
+
+def _json_record(record):
+    if not isinstance(record, dict):
+        raise ImportFormatError('Every JSON record must be an object')
+    return record
+
+
+def _formdata(record):
+    data = MultiDict()
+    for key, value in record.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = 'y' if value else ''
+        data[key] = str(value)
+    return data
+
+
+def _validate(form, record, fields):
+    """Run one record through a reused form; returns (values, None) or (None, errors)"""
+    form.process(formdata=_formdata(record))
+    if not form.validate():
+        return None, form.errors
+    return {field: form[field].data for field in fields}, None
+
+
+def _upsert_customers(rows, existing, columns):
+    """Insert customers, updating those whose email exists.
+
+    Passing the rows as parameters lets SQLAlchemy send them as multi-row
+    INSERT ... VALUES batches from one cached compiled statement. Existing
+    customers only get the given columns; `existing` maps the emails already
+    on file to their ids, for dialects without an upsert.
+    """
+    dialect = db.session.get_bind().dialect.name
+    changed = [column for column in columns if column != 'email']
+    # Upserts don't apply the column's onupdate, so updated_at is set explicitly
+    now = datetime.utcnow()
+    if dialect == 'mysql':
+        stmt = mysql_insert(Customer)
+        stmt = stmt.on_duplicate_key_update(
+            **{column: stmt.inserted[column] for column in changed}, updated_at=now
+        )
+    elif dialect == 'sqlite':
+        stmt = sqlite_insert(Customer)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['email'],
+            set_={**{column: stmt.excluded[column] for column in changed}, 'updated_at': now}
+        )
+    else:
+        # No native upsert: update the customers already on file by id and insert the rest
+        updates = [
+            {**{column: row[column] for column in changed}, 'id': existing[row['email']], 'updated_at': now}
+            for row in rows if row['email'] in existing
+        ]
+        inserts = [row for row in rows if row['email'] not in existing]
+        if updates:
+            db.session.execute(update(Customer), updates)
+        if inserts:
+            db.session.execute(insert(Customer), inserts)
+        return
+    db.session.execute(stmt, rows)
+
+
+def _import_customer_batch(batch, result):
+    emails = [values['email'] for _, values, _ in batch]
+    existing = dict(db.session.execute(select(Customer.email, Customer.id).where(Customer.email.in_(emails))).all())
+    # One statement per set of columns, so a file's missing columns are left alone on existing customers
+    groups = {}
+    for _, values, columns in batch:
+        groups.setdefault(columns, []).append(values)
+    for columns, rows in groups.items():
+        _upsert_customers(rows, existing, columns)
+    result.updated += len(existing)
+    result.created += len(batch) - len(existing)
+
+
+def _import_menu_batch(batch, result):
+    # Rows name the item to update by id, otherwise by its exact name
+    ids = [values['id'] for _, values, _ in batch if values.get('id')]
+    names = [values['name'] for _, values, _ in batch if not values.get('id')]
+    known_ids = set(db.session.scalars(select(MenuItem.id).where(MenuItem.id.in_(ids)))) if ids else set()
+    by_name = {}
+    if names:
+        for item_id, name in db.session.execute(select(MenuItem.id, MenuItem.name).where(MenuItem.name.in_(names))):
+            by_name.setdefault(name, []).append(item_id)
+
+    inserts, updates = [], []
+    for row, values, columns in batch:
+        item_id = values.pop('id', None)
+        # Existing items only get the columns the record has
+        changed = {column: values[column] for column in columns}
+        if item_id:
+            if item_id not in known_ids:
+                result.error(row, 'id', f'No menu item with id {item_id}.')
+                continue
+            updates.append({'id': item_id, **changed})
+        elif len(by_name.get(values['name'], [])) > 1:
+            result.error(row, 'name', 'Several menu items have this name; give the id to update.')
+        elif values['name'] in by_name:
+            updates.append({'id': by_name[values['name']][0], **changed})
+        else:
+            inserts.append(values)
+
+    if inserts:
+        db.session.execute(insert(MenuItem), inserts)
+    # One bulk UPDATE per set of columns
+    groups = {}
+    for values in updates:
+        groups.setdefault(tuple(values), []).append(values)
+    for rows in groups.values():
+        db.session.execute(update(MenuItem), rows)
+    result.created += len(inserts)
+    result.updated += len(updates)
+
+
+def _menu_id(record, row, result):
+    value = record.get('id')
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        result.error(row, 'id', 'Not a valid integer value.')
+        return False
+
+
+def import_records(kind, records, batch_size=BATCH_SIZE, dry_run=False):
+    """Validate and upsert customers or menu items from an iterable of dicts.
+
+    Each record goes through the same validators as the add/edit forms; failing
+    rows are reported and skipped. Valid rows are written in batches of
+    batch_size, one multi-row statement and one transaction per batch, so a
+    bad row never rolls back the good ones around it. Customers are matched
+    on email; menu items on id when given, otherwise on name. Matched rows
+    only get the columns the record has; new rows get form defaults for the rest.
+    """
+    if kind not in IMPORT_KINDS:
+        raise ImportFormatError(f'kind must be one of {", ".join(IMPORT_KINDS)}')
+    result = ImportResult()
+    if kind == 'customers':
+        form = CustomerImportForm(formdata=None)
+        fields = ('name', 'email', 'phone', 'address')
+        write_batch = _import_customer_batch
+    else:
+        form = MenuItemImportForm(formdata=None)
+        fields = ('name', 'description', 'price', 'category', 'image_url', 'available')
+        write_batch = _import_menu_batch
+
+    seen = set()  # customer emails / menu names (or ids) already in this file
+    batch = []
+    for row, record in enumerate(records, 1):
+        result.rows = row
+        columns = tuple(field for field in fields if field in record)
+        if kind == 'menu':
+            record = dict(record)
+            # A missing column or blank cell keeps the form default; "no"/"0" in a file mean unavailable
+            available = record.get('available')
+            if available is None or str(available).strip() == '':
+                available = True
+                columns = tuple(field for field in columns if field != 'available')
+            record['available'] = available if isinstance(available, bool) else str(available).strip().lower() not in FALSE_VALUES
+            item_id = _menu_id(record, row, result)
+            if item_id is False:
+                continue
+
+        values, errors = _validate(form, record, fields)
+        if errors:
+            result.errors.append({'row': row, 'errors': errors})
+            continue
+
+        if kind == 'customers':
+            key = values['email'].lower()
+            if key in seen:
+                result.error(row, 'email', 'Email appears earlier in this file.')
+                continue
+            seen.add(key)
+            values['phone'] = values['phone'] or None
+            values['address'] = values['address'] or None
+        else:
+            key = item_id or values['name']
+            if key in seen:
+                result.error(row, 'id' if item_id else 'name', 'Item appears earlier in this file.')
+                continue
+            seen.add(key)
+            values['id'] = item_id
+            values['description'] = values['description'] or None
+            values['image_url'] = values['image_url'] or None
+
+        batch.append((row, values, columns))
+        if len(batch) >= batch_size:
+            _write(write_batch, batch, result, dry_run)
+            batch = []
+    if batch:
+        _write(write_batch, batch, result, dry_run)
+
+    if not dry_run and result.created + result.updated:
+        if kind == 'customers':
+            reset_index()
+        else:
+            bump_menu_version()
+    result.errors.sort(key=lambda e: e['row'])
+    return result
+
+
+def _write(write_batch, batch, result, dry_run):
+    write_batch(batch, result)
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
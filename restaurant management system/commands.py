@@ -0,0 +1,202 @@
+import click
+from datetime import datetime
+from sqlalchemy import func
+
+from models import Order
+from inventory_depletion import deplete_pending_orders
+from exports import EXPORT_FORMATS, export_chunks, export_filename
+from sales_rollup import backfill
+import bulk_import
+import delta_sync
+import serve
+import benchmark
+
+from extensions import db
+
+
+def register_commands(app):
+    # Inventory commands
+    @app.cli.group()
+    def inventory():
+        """Inventory maintenance commands."""
+    
+    @inventory.command('deplete')
+    @click.option('--batch-size', default=1000, show_default=True, help='Orders deducted per transaction.')
+    def inventory_deplete(batch_size):
+        """Deduct recipe ingredients for all completed orders not yet processed."""
+        result = deplete_pending_orders(batch_size=batch_size)
+        click.echo(f'Deducted stock for {result.orders} orders across {result.ingredients} ingredient updates.')
+        for item in result.low_stock:
+            click.echo(f"Low stock: {item['name']} ({item['quantity']:g} {item['unit']}, reorder at {item['reorder_level']:g})")
+    
+    # Export commands
+    @app.cli.group()
+    def export():
+        """Data export commands."""
+    
+    @export.command('orders')
+    @click.option('--format', 'export_format', type=click.Choice(EXPORT_FORMATS), default='csv', show_default=True)
+    @click.option('--gzip', 'compress', is_flag=True, help='Gzip the output.')
+    @click.option('--from', 'date_from', type=click.DateTime(formats=['%Y-%m-%d']), help='First day (inclusive).')
+    @click.option('--to', 'date_to', type=click.DateTime(formats=['%Y-%m-%d']), help='Last day (inclusive).')
+    @click.option('--output', '-o', type=click.Path(dir_okay=False), help='Output file (default: generated name, "-" for stdout).')
+    def export_orders(export_format, compress, date_from, date_to, output):
+        """Stream orders and their line items to CSV or JSON Lines."""
+        date_from = date_from.date() if date_from else None
+        date_to = date_to.date() if date_to else None
+        output = output or export_filename(export_format, compress, date_from, date_to)
+        
+        with click.open_file(output, 'wb') as f:
+            for chunk in export_chunks(export_format, compress, date_from, date_to):
+                f.write(chunk)
+        if output != '-':
+            click.echo(f'Wrote {output}')
+    
+    # Report commands
+    @app.cli.group()
+    def reports():
+        """Sales report maintenance commands."""
+    
+    @reports.command('backfill')
+    @click.option('--from', 'date_from', type=click.DateTime(formats=['%Y-%m-%d']), help='First day (default: first order).')
+    @click.option('--to', 'date_to', type=click.DateTime(formats=['%Y-%m-%d']), help='Last day (default: today).')
+    def reports_backfill(date_from, date_to):
+        """Rebuild the daily sales rollup from raw orders."""
+        if date_from is None:
+            first_order = db.session.query(func.min(Order.created_at)).scalar()
+            if first_order is None:
+                click.echo('No orders to roll up.')
+                return
+            date_from = first_order
+        date_to = date_to or datetime.utcnow()
+        
+        days = backfill(date_from.date(), date_to.date())
+        click.echo(f'Rebuilt daily sales for {days} day(s).')
+    
+    # Sync commands
+    @app.cli.group()
+    def sync():
+        """Terminal sync maintenance commands."""
+    
+    @sync.command('prune')
+    @click.option('--batch-size', default=delta_sync.PRUNE_BATCH_SIZE, show_default=True,
+                  help='Tombstones deleted per transaction.')
+    def sync_prune(batch_size):
+        """Delete deletion tombstones older than SYNC_TOMBSTONE_DAYS."""
+        pruned = delta_sync.prune_tombstones(batch_size=batch_size)
+        click.echo(f"Pruned {pruned} tombstone(s) older than {app.config['SYNC_TOMBSTONE_DAYS']} days.")
+    
+    # Import commands
+    @app.cli.command('import')
+    @click.argument('kind', type=click.Choice(bulk_import.IMPORT_KINDS))
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'import_format', type=click.Choice(bulk_import.IMPORT_FORMATS),
+                  help='File format (default: from the file extension, else csv).')
+    @click.option('--batch-size', default=bulk_import.BATCH_SIZE, show_default=True, help='Rows written per statement and transaction.')
+    @click.option('--dry-run', is_flag=True, help='Validate and report without saving anything.')
+    def import_data(kind, path, import_format, batch_size, dry_run):
+        """Bulk upsert customers (matched on email) or menu items (matched on id, else name) from CSV or JSON."""
+        import_format = import_format or bulk_import.detect_format(path)
+        with open(path, 'rb') as f:
+            try:
+                result = bulk_import.import_records(
+                    kind, bulk_import.iter_records(f, import_format), batch_size=batch_size, dry_run=dry_run
+                )
+            except ValueError as e:
+                raise click.ClickException(f'Could not read {path}: {e}')
+        
+        for error in result.errors:
+            messages = '; '.join(f'{field}: {" ".join(msgs)}' for field, msgs in error['errors'].items())
+            click.echo(f"Row {error['row']}: {messages}", err=True)
+        prefix = 'Dry run: would have created' if dry_run else 'Created'
+        click.echo(f'{prefix} {result.created}, updated {result.updated}, skipped {len(result.errors)} of {result.rows} rows.')
+    
+    # Production server
+    @app.cli.command('serve', with_appcontext=False)
+    @click.option('--bind', '-b', help='Address to listen on (default: SERVE_BIND or 0.0.0.0:8000).')
+    @click.option('--workers', '-w', type=int, help='Worker processes (default: SERVE_WORKERS or 1).')
+    @click.option('--threads', type=int, help='Threads per worker (default: SERVE_THREADS or 4).')
+    def serve_app(bind, workers, threads):
+        """Run the app under gunicorn with preloaded, forked workers."""
+        try:
+            serve.run(app, bind=bind, workers=workers, threads=threads)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+    
+    # Benchmark commands
+    @app.cli.group()
+    def bench():
+        """Load testing against a local database (point DATABASE_URL at a scratch one)."""
+        # Seeding bulk-inserts every row in one transaction, which can't be stamped
+        # again at commit; no terminal syncs from a scratch database
+        app.config['SYNC_MAX_TRANSACTION_SECONDS'] = 0
+    
+    @bench.command('seed')
+    @click.option('--orders', default=10000, show_default=True, help='Synthetic orders to create.')
+    @click.option('--reset', is_flag=True, help='Drop and recreate all tables first.')
+    @click.option('--yes', is_flag=True, help='Do not ask before dropping tables.')
+    def bench_seed(orders, reset, yes):
+        """Seed tables, menu items, customers and orders with synthetic data."""
+        if reset:
+            if not yes:
+                click.confirm(f'Drop every table in {db.engine.url.render_as_string(hide_password=True)}?', abort=True)
+            benchmark.reset_database()
+        elif db.session.query(Order.id).first() is not None:
+            raise click.ClickException('The database already has orders; use --reset on a scratch database.')
+        counts = benchmark.seed(orders)
+        click.echo(', '.join(f'{count} {name.replace("_", " ")}' for name, count in counts.items()))
+        click.echo(f'Log in as {benchmark.BENCH_USERNAME} / {benchmark.BENCH_PASSWORD} to drive load against it.')
+    
+    @bench.command('run')
+    @click.option('--sizes', default=','.join(str(s) for s in benchmark.DEFAULT_SIZES), show_default=True,
+                  help='Comma-separated order counts to benchmark at.')
+    @click.option('--requests', 'request_count', default=benchmark.DEFAULT_REQUESTS, show_default=True,
+                  help='Timed requests per endpoint and size.')
+    @click.option('--baseline', 'baseline_path', default='benchmark_baseline.json', show_default=True,
+                  type=click.Path(dir_okay=False))
+    @click.option('--tolerance', type=float,
+                  help='Also fail when p95 grows by more than this fraction of the baseline (off by default; '
+                       'only meaningful against a baseline recorded on the same machine).')
+    @click.option('--update-baseline', is_flag=True, help='Store these results as the new baseline.')
+    @click.option('--cached', is_flag=True, help='Keep the configured cache TTLs instead of measuring uncached work.')
+    @click.option('--yes', is_flag=True, help='Do not ask before dropping tables.')
+    def bench_run(sizes, request_count, baseline_path, tolerance, update_baseline, cached, yes):
+        """Reseed at each size, measure p95 latency and queries per request, and fail on regressions."""
+        sizes = [int(s) for s in sizes.split(',') if s.strip()]
+        if not yes:
+            click.confirm(f'Drop every table in {db.engine.url.render_as_string(hide_password=True)}?', abort=True)
+        
+        app.config['WTF_CSRF_ENABLED'] = False
+        if not cached:
+            # Otherwise most requests would only measure a cache hit
+            for key in ('DASHBOARD_STATS_TTL', 'MENU_CACHE_TTL', 'FLOOR_MAP_TTL', 'CUSTOMER_INDEX_TTL'):
+                app.config[key] = 0
+        
+        dialect = db.engine.dialect.name
+        baseline = benchmark.load_baseline(baseline_path)
+        regressions = []
+        for size in sizes:
+            benchmark.reset_database()
+            benchmark.seed(size)
+            results = benchmark.measure(app, requests=request_count)
+            
+            click.echo(f'\n{dialect}, {size} orders')
+            click.echo(f"{'endpoint':<20}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'queries':>10}")
+            for name, r in results.items():
+                click.echo(f"{name:<20}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['max_ms']:>10.2f}{r['queries_max']:>10}")
+            
+            expected = baseline.get(dialect, {}).get(str(size), {})
+            regressions.extend(f'{size} orders, {line}' for line in benchmark.compare(results, expected, tolerance))
+            if update_baseline:
+                baseline.setdefault(dialect, {})[str(size)] = results
+        
+        if update_baseline:
+            benchmark.save_baseline(baseline_path, baseline)
+            click.echo(f'\nSaved baseline to {baseline_path}')
+        elif regressions:
+            click.echo('\nRegressions against the baseline:', err=True)
+            for line in regressions:
+                click.echo(f'  {line}', err=True)
+            raise SystemExit(1)
+        else:
+            click.echo('\nNo regressions against the baseline.')
@@ -0,0 +1,120 @@
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Optional dependency; gzip covers every browser
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = (
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+    'application/javascript', 'application/json', 'application/x-ndjson', 'image/svg+xml'
+)
+MAX_BODY_BYTES = 4 * 1024 * 1024
+
+
+def choose_encoding(accept_encoding, brotli_available=True):
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0; None if neither is acceptable"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = quality
+    for coding in (('br', 'gzip') if brotli_available else ('gzip',)):
+        if accepted.get(coding, accepted.get('*', 0)) > 0:
+            return coding
+    return None
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class CompressedBodyCache:
+    """Compressed bodies of responses with a strong ETag (static files, the menu), LRU-bounded"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (path, etag, encoding) -> bytes
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+def init_compression(app):
+    """Compress HTML, JSON and other text responses of at least COMPRESS_MIN_SIZE bytes.
+
+    Streamed responses (exports, the kitchen event stream) and bodies that are
+    already encoded are left alone. Bodies with a strong ETag are compressed
+    once per encoding and reused; the ETag turns weak, since the bytes differ
+    from the uncompressed representation, which If-None-Match still matches.
+    """
+    cache = CompressedBodyCache(app.config['COMPRESS_CACHE_SIZE'])
+
+    @app.after_request
+    def compress_response(response):
+        config = app.config
+        if (
+            not config['COMPRESS_MIN_SIZE']
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            # send_file responses also count as streamed but pass a file through; small ones are fine
+            or (response.is_streamed and not response.direct_passthrough)
+            or (response.content_length or 0) > MAX_BODY_BYTES
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers
+            or request.method == 'HEAD'
+        ):
+            return response
+        response.vary.add('Accept-Encoding')
+
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'), brotli is not None)
+        if encoding is None:
+            return response
+        response.direct_passthrough = False
+        data = response.get_data()
+        if len(data) < config['COMPRESS_MIN_SIZE']:
+            return response
+
+        etag, weak = response.get_etag()
+        key = (request.path, etag, encoding) if etag and not weak else None
+        body = cache.get(key) if key else None
+        if body is None:
+            level = config['COMPRESS_BROTLI_QUALITY'] if encoding == 'br' else config['COMPRESS_GZIP_LEVEL']
+            body = compress(data, encoding, level)
+            if key:
+                cache.put(key, body)
+        if len(body) >= len(data):
+            return response
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        # Byte ranges would refer to the uncompressed file
+        response.headers.pop('Accept-Ranges', None)
+        if etag:
+            response.set_etag(etag, weak=True)
+        return response
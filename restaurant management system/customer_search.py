@@ -0,0 +1,193 @@
+import bisect
+import re
+import threading
+import time
+
+from flask import current_app
+
+from extensions import db
+from models import Customer
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _normalise(value):
+    return (value or '').strip().lower()
+
+
+def _digits(value):
+    return re.sub(r'\D', '', value or '')
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class CustomerIndex:
+    """In-memory trigram and prefix index over customer name, email and phone.
+
+    Queries of three or more characters intersect trigram posting sets and then
+    confirm the substring; shorter queries use a sorted list of word prefixes.
+    Both are maintained incrementally as customers are added, edited or deleted.
+    """
+
+    def __init__(self, customers):
+        self.built_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.docs = {}  # id -> (name, email, phone, haystacks)
+        self.postings = {}  # trigram -> set of ids
+        self.prefixes = []  # sorted (token, id)
+        for customer in customers:
+            self._add(*customer, keep_sorted=False)
+        self.prefixes.sort()
+
+    def _haystacks(self, name, email, phone):
+        haystacks = [_normalise(name), _normalise(email)]
+        digits = _digits(phone)
+        if digits:
+            haystacks.append(digits)
+        return [h for h in haystacks if h]
+
+    def _tokens(self, haystacks):
+        tokens = set()
+        for haystack in haystacks:
+            tokens.add(haystack)
+            tokens.update(re.split(r'[\s@._-]+', haystack))
+        return {t for t in tokens if t}
+
+    def _add(self, customer_id, name, email, phone, keep_sorted=True):
+        haystacks = self._haystacks(name, email, phone)
+        self.docs[customer_id] = (name, email, phone, haystacks)
+        for haystack in haystacks:
+            for gram in _trigrams(haystack):
+                self.postings.setdefault(gram, set()).add(customer_id)
+        for token in self._tokens(haystacks):
+            if keep_sorted:
+                bisect.insort(self.prefixes, (token, customer_id))
+            else:
+                self.prefixes.append((token, customer_id))
+
+    def _remove(self, customer_id):
+        doc = self.docs.pop(customer_id, None)
+        if doc is None:
+            return
+        haystacks = doc[3]
+        for haystack in haystacks:
+            for gram in _trigrams(haystack):
+                ids = self.postings.get(gram)
+                if ids is not None:
+                    ids.discard(customer_id)
+                    if not ids:
+                        del self.postings[gram]
+        for token in self._tokens(haystacks):
+            i = bisect.bisect_left(self.prefixes, (token, customer_id))
+            if i < len(self.prefixes) and self.prefixes[i] == (token, customer_id):
+                del self.prefixes[i]
+
+    def upsert(self, customer_id, name, email, phone):
+        with self._lock:
+            self._remove(customer_id)
+            self._add(customer_id, name, email, phone)
+
+    def remove(self, customer_id):
+        with self._lock:
+            self._remove(customer_id)
+
+    def _match_ids(self, query):
+        needles = [_normalise(query)]
+        digits = _digits(query)
+        if len(digits) >= 3 and digits != needles[0]:
+            needles.append(digits)
+
+        matched = set()
+        for needle in needles:
+            if len(needle) >= 3:
+                grams = sorted(_trigrams(needle), key=lambda g: len(self.postings.get(g, ())))
+                candidates = set(self.postings.get(grams[0], ()))
+                for gram in grams[1:]:
+                    if not candidates:
+                        break
+                    candidates &= self.postings.get(gram, set())
+                matched.update(
+                    cid for cid in candidates
+                    if any(needle in haystack for haystack in self.docs[cid][3])
+                )
+            else:
+                i = bisect.bisect_left(self.prefixes, (needle, -1))
+                while i < len(self.prefixes) and self.prefixes[i][0].startswith(needle):
+                    matched.add(self.prefixes[i][1])
+                    i += 1
+        return matched
+
+    def search(self, query, page=1, per_page=DEFAULT_PAGE_SIZE):
+        """Return (results, has_next); name-prefix matches rank first, then alphabetical"""
+        needle = _normalise(query)
+        with self._lock:
+            ids = self._match_ids(query)
+            ranked = sorted(
+                ids,
+                key=lambda cid: (not _normalise(self.docs[cid][0]).startswith(needle), _normalise(self.docs[cid][0]), cid)
+            )
+            start = (page - 1) * per_page
+            window = ranked[start:start + per_page]
+            results = [{
+                'id': cid,
+                'name': self.docs[cid][0],
+                'email': self.docs[cid][1],
+                'phone': self.docs[cid][2]
+            } for cid in window]
+        return results, len(ranked) > start + per_page
+
+
+_index_lock = threading.Lock()
+_index = None
+
+
+def get_index():
+    """Return the process-wide index, rebuilding it when older than CUSTOMER_INDEX_TTL.
+
+    The TTL bounds how long other worker processes' edits stay invisible here.
+    """
+    global _index
+    ttl = current_app.config.get('CUSTOMER_INDEX_TTL', 0)
+    index = _index
+    if index is not None and time.monotonic() - index.built_at < ttl:
+        return index
+    with _index_lock:
+        if _index is None or time.monotonic() - _index.built_at >= ttl:
+            rows = db.session.query(Customer.id, Customer.name, Customer.email, Customer.phone).all()
+            _index = CustomerIndex(rows)
+        return _index
+
+
+def index_customer(customer):
+    if _index is not None:
+        _index.upsert(customer.id, customer.name, customer.email, customer.phone)
+
+
+def unindex_customer(customer_id):
+    if _index is not None:
+        _index.remove(customer_id)
+
+
+def reset_index():
+    """Drop the index after bulk changes; the next search rebuilds it"""
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def search_customers(query, page=1, per_page=DEFAULT_PAGE_SIZE):
+    """Return (results, page, per_page, has_next); an empty query pages through everyone by name"""
+    page = max(1, page or 1)
+    per_page = max(1, min(per_page or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    if _normalise(query):
+        results, has_next = get_index().search(query, page, per_page)
+        return results, page, per_page, has_next
+
+    rows = db.session.query(Customer.id, Customer.name, Customer.email, Customer.phone).order_by(
+        Customer.name, Customer.id
+    ).offset((page - 1) * per_page).limit(per_page + 1).all()
+    results = [{'id': r.id, 'name': r.name, 'email': r.email, 'phone': r.phone} for r in rows[:per_page]]
+    return results, page, per_page, len(rows) > per_page
@@ -0,0 +1,121 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import case, func, select, true
+
+from extensions import db
+from models import Customer, MenuItem, Order, OrderItem, Table
+
+ACTIVE_STATUSES = ('pending', 'preparing')
+
+_cache_lock = threading.Lock()
+_cache = {}  # day -> (expires_at, stats, popular_items)
+
+
+def _day_start(day):
+    return datetime.combine(day, datetime.min.time())
+
+
+def _compute_stats(today):
+    today_start = _day_start(today)
+    tomorrow_start = today_start + timedelta(days=1)
+    yesterday_start = today_start - timedelta(days=1)
+    week_ago_start = _day_start(today - timedelta(days=7))
+
+    customer_counts = select(
+        func.count(Customer.id).label('total_customers'),
+        func.coalesce(func.sum(case((Customer.created_at >= week_ago_start, 1), else_=0)), 0).label('new_customers')
+    ).subquery()
+    table_counts = select(
+        func.count(Table.id).label('total_tables'),
+        func.coalesce(func.sum(case((Table.status == 'available', 1), else_=0)), 0).label('available_tables'),
+        func.coalesce(func.sum(case((Table.status == 'occupied', 1), else_=0)), 0).label('occupied_tables')
+    ).subquery()
+    order_counts = select(
+        func.count(Order.id).label('total_orders'),
+        func.coalesce(func.sum(case((Order.status.in_(ACTIVE_STATUSES), 1), else_=0)), 0).label('active_orders')
+    ).subquery()
+
+    # Revenue filters in WHERE on (status, created_at) so idx_order_status_created_at
+    # reads just two days of completed orders instead of every order
+    revenue = select(
+        func.coalesce(func.sum(case((Order.created_at >= today_start, Order.total_amount), else_=0)), 0)
+        .label('today_revenue'),
+        func.coalesce(func.sum(case((Order.created_at < today_start, Order.total_amount), else_=0)), 0)
+        .label('yesterday_revenue')
+    ).where(
+        Order.status == 'completed',
+        Order.created_at >= yesterday_start,
+        Order.created_at < tomorrow_start
+    ).subquery()
+
+    # Each subquery yields exactly one row, so joining them on true is a plain concatenation
+    row = db.session.execute(
+        select(order_counts, revenue, customer_counts, table_counts).select_from(
+            order_counts.join(revenue, true()).join(customer_counts, true()).join(table_counts, true())
+        )
+    ).one()
+
+    today_revenue = float(row.today_revenue or 0)
+    yesterday_revenue = float(row.yesterday_revenue or 0)
+    if yesterday_revenue > 0:
+        revenue_change = round(((today_revenue - yesterday_revenue) / yesterday_revenue) * 100, 1)
+    else:
+        revenue_change = 0
+
+    stats = {
+        'total_orders': row.total_orders,
+        'active_orders': int(row.active_orders),
+        'today_revenue': f"{today_revenue:.2f}",
+        'revenue_change': revenue_change,
+        'total_customers': row.total_customers,
+        'new_customers': int(row.new_customers),
+        'total_tables': row.total_tables,
+        'available_tables': int(row.available_tables),
+        'occupied_tables': int(row.occupied_tables)
+    }
+
+    # Popular menu items (based on order frequency)
+    popular_items_query = db.session.query(
+        MenuItem.id,
+        MenuItem.name,
+        MenuItem.category,
+        MenuItem.price,
+        func.count(OrderItem.id).label('order_count')
+    ).join(OrderItem).group_by(MenuItem.id).order_by(func.count(OrderItem.id).desc()).limit(5).all()
+
+    popular_items = [{
+        'name': item.name,
+        'category': item.category,
+        'price': item.price,
+        'order_count': item.order_count
+    } for item in popular_items_query]
+
+    return stats, popular_items
+
+
+def get_dashboard_stats():
+    """Return (stats, popular_items), cached per process for DASHBOARD_STATS_TTL seconds"""
+    ttl = current_app.config.get('DASHBOARD_STATS_TTL', 0)
+    today = date.today()
+    now = time.monotonic()
+
+    with _cache_lock:
+        cached = _cache.get(today)
+        if cached and cached[0] > now:
+            return cached[1], cached[2]
+
+    stats, popular_items = _compute_stats(today)
+
+    if ttl > 0:
+        with _cache_lock:
+            _cache.clear()
+            _cache[today] = (now + ttl, stats, popular_items)
+    return stats, popular_items
+
+
+def invalidate_dashboard_stats():
+    with _cache_lock:
+        _cache.clear()
@@ -29,7 +29,8 @@ CREATE TABLE `customer` (
     `email` VARCHAR(120) UNIQUE,
     `phone` VARCHAR(20),
     `address` TEXT,
-    `created_at` DATETIME DEFAULT CURRENT_TIMESTAMP
+    `created_at` DATETIME DEFAULT CURRENT_TIMESTAMP,
+    `updated_at` DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 ) ENGINE=InnoDB CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- =====================================================
@@ -39,11 +40,12 @@ CREATE TABLE `menu_item` (
     `id` INT AUTO_INCREMENT PRIMARY KEY,
     `name` VARCHAR(100) NOT NULL,
     `description` TEXT,
-    `price` FLOAT NOT NULL,
+    `price` DECIMAL(10,2) NOT NULL,
     `category` VARCHAR(50) NOT NULL,
     `image_url` VARCHAR(255),
     `available` BOOLEAN DEFAULT TRUE,
-    `created_at` DATETIME DEFAULT CURRENT_TIMESTAMP
+    `created_at` DATETIME DEFAULT CURRENT_TIMESTAMP,
+    `updated_at` DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 ) ENGINE=InnoDB CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- =====================================================
@@ -53,7 +55,9 @@ CREATE TABLE `table` (
     `id` INT AUTO_INCREMENT PRIMARY KEY,
     `table_number` INT NOT NULL UNIQUE,
     `capacity` INT NOT NULL,
-    `status` VARCHAR(20) DEFAULT 'available'
+    `status` VARCHAR(20) DEFAULT 'available',
+    `version` INT NOT NULL DEFAULT 0,
+    `updated_at` DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 ) ENGINE=InnoDB CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- =====================================================
@@ -65,9 +69,10 @@ CREATE TABLE `order` (
     `user_id` INT NOT NULL,
     `customer_id` INT,
     `status` VARCHAR(20) DEFAULT 'pending',
-    `total_amount` FLOAT DEFAULT 0.0,
+    `total_amount` DECIMAL(10,2) DEFAULT 0.00,
     `created_at` DATETIME DEFAULT CURRENT_TIMESTAMP,
     `updated_at` DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    `inventory_depleted_at` DATETIME NULL,
     
     -- Foreign Key Constraints
     FOREIGN KEY (`table_id`) REFERENCES `table`(`id`) ON DELETE RESTRICT ON UPDATE CASCADE,
@@ -83,10 +88,11 @@ CREATE TABLE `order_item` (
     `order_id` INT NOT NULL,
     `menu_item_id` INT NOT NULL,
     `quantity` INT DEFAULT 1,
-    `price` FLOAT NOT NULL,
+    `price` DECIMAL(10,2) NOT NULL,
     `status` VARCHAR(20) DEFAULT 'pending',
     `notes` TEXT,
     `created_at` DATETIME DEFAULT CURRENT_TIMESTAMP,
+    `updated_at` DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     
     -- Foreign Key Constraints
     FOREIGN KEY (`order_id`) REFERENCES `order`(`id`) ON DELETE CASCADE ON UPDATE CASCADE,
@@ -127,18 +133,83 @@ CREATE TABLE `inventory` (
     `last_updated` DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 ) ENGINE=InnoDB CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- =====================================================
+-- 9. RECIPE_INGREDIENT TABLE (matches SQLAlchemy RecipeIngredient model)
+-- =====================================================
+CREATE TABLE `recipe_ingredient` (
+    `id` INT AUTO_INCREMENT PRIMARY KEY,
+    `menu_item_id` INT NOT NULL,
+    `inventory_id` INT NOT NULL,
+    `quantity` FLOAT NOT NULL,
+    
+    -- One line per ingredient per menu item
+    CONSTRAINT `uq_recipe_ingredient` UNIQUE (`menu_item_id`, `inventory_id`),
+    
+    -- Foreign Key Constraints
+    FOREIGN KEY (`menu_item_id`) REFERENCES `menu_item`(`id`) ON DELETE CASCADE ON UPDATE CASCADE,
+    FOREIGN KEY (`inventory_id`) REFERENCES `inventory`(`id`) ON DELETE RESTRICT ON UPDATE CASCADE
+) ENGINE=InnoDB CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- =====================================================
+-- 10. DAILY_SALES TABLE (matches SQLAlchemy DailySales model)
+-- =====================================================
+-- Per day, per menu item rollup of completed orders; rebuild with `flask reports backfill`
+CREATE TABLE `daily_sales` (
+    `id` INT AUTO_INCREMENT PRIMARY KEY,
+    `day` DATE NOT NULL,
+    `menu_item_id` INT NOT NULL,
+    `category` VARCHAR(50) NOT NULL,
+    `quantity` INT NOT NULL DEFAULT 0,
+    `revenue` DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    `order_count` INT NOT NULL DEFAULT 0,
+    
+    CONSTRAINT `uq_daily_sales_day_item` UNIQUE (`day`, `menu_item_id`),
+    
+    -- Foreign Key Constraints
+    FOREIGN KEY (`menu_item_id`) REFERENCES `menu_item`(`id`) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE=InnoDB CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Deleted orders, order items, tables and menu items, for /api/sync
+CREATE TABLE `sync_tombstone` (
+    `id` INT AUTO_INCREMENT PRIMARY KEY,
+    `entity` VARCHAR(20) NOT NULL,
+    `entity_id` INT NOT NULL,
+    `deleted_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- =====================================================
 -- INDEXES FOR PERFORMANCE
 -- =====================================================
-CREATE INDEX idx_user_username ON `user`(username);
-CREATE INDEX idx_user_email ON `user`(email);
-CREATE INDEX idx_customer_email ON `customer`(email);
+-- Keep in sync with __table_args__ in models.py and the Flask-Migrate revisions
+-- in migrations/versions. UNIQUE columns already have their own index.
 CREATE INDEX idx_menu_item_category ON `menu_item`(category);
 CREATE INDEX idx_menu_item_available ON `menu_item`(available);
-CREATE INDEX idx_table_number ON `table`(table_number);
+CREATE INDEX idx_menu_item_updated_at ON `menu_item`(updated_at);
 CREATE INDEX idx_table_status ON `table`(status);
-CREATE INDEX idx_order_status ON `order`(status);
+CREATE INDEX idx_table_updated_at ON `table`(updated_at);
+CREATE INDEX idx_order_status_created_at ON `order`(status, created_at);
 CREATE INDEX idx_order_created_at ON `order`(created_at);
+CREATE INDEX idx_order_table_id ON `order`(table_id);
+CREATE INDEX idx_order_customer_id ON `order`(customer_id);
+CREATE INDEX idx_order_updated_at ON `order`(updated_at);
+CREATE INDEX idx_order_item_order_id ON `order_item`(order_id);
+CREATE INDEX idx_order_item_menu_item_id ON `order_item`(menu_item_id);
+CREATE INDEX idx_order_item_updated_at ON `order_item`(updated_at);
+CREATE INDEX idx_reservation_table_slot ON `reservation`(table_id, reservation_date, reservation_time);
+CREATE INDEX idx_reservation_date ON `reservation`(reservation_date);
+CREATE INDEX idx_recipe_ingredient_inventory_id ON `recipe_ingredient`(inventory_id);
+CREATE INDEX idx_daily_sales_day_category ON `daily_sales`(day, category);
+CREATE INDEX idx_sync_tombstone_deleted_at ON `sync_tombstone`(deleted_at);
+
+-- =====================================================
+-- MIGRATION VERSION
+-- =====================================================
+-- Marks this schema as the current Flask-Migrate head so `flask db upgrade`
+-- only applies revisions added after it.
+CREATE TABLE `alembic_version` (
+    `version_num` VARCHAR(32) NOT NULL PRIMARY KEY
+) ENGINE=InnoDB CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+INSERT INTO `alembic_version` (`version_num`) VALUES ('9b3e7f1c5a62');
 
 -- =====================================================
 -- SAMPLE DATA INSERTION (Updated for correct schema)
@@ -228,3 +299,6 @@ DESCRIBE `order`;
 DESCRIBE `order_item`;
 DESCRIBE `reservation`;
 DESCRIBE `inventory`;
+DESCRIBE `recipe_ingredient`;
+DESCRIBE `daily_sales`;
+DESCRIBE `sync_tombstone`;
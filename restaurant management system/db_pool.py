@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait to check out a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+
+def engine_options_from_env(database_uri):
+    """Build SQLALCHEMY_ENGINE_OPTIONS from DB_POOL_* environment variables"""
+    if database_uri.startswith('sqlite'):
+        # SQLite picks its own pool class; sizing options don't apply
+        return {}
+    return {
+        'poolclass': TimedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '10')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '20')),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),
+        # Below MySQL's wait_timeout so idle connections are replaced before the server drops them
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+    }
+
+
+def pool_stats(pool):
+    """Snapshot of pool occupancy and checkout wait statistics"""
+    stats = {'pool_class': type(pool).__name__}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    if isinstance(pool, TimedQueuePool):
+        with pool._stats_lock:
+            stats.update({
+                'checkouts': pool.checkouts,
+                'timeouts': pool.timeouts,
+                'wait_seconds_total': round(pool.wait_total, 6),
+                'wait_seconds_max': round(pool.wait_max, 6),
+            })
+    return stats
+
+
+def format_prometheus(stats, prefix='restaurant_db_pool'):
+    lines = []
+    for name, value in stats.items():
+        if isinstance(value, (int, float)):
+            lines.append(f'{prefix}_{name} {value}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,272 @@
+import base64
+import json
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import and_, delete, event, insert, or_, select, update
+from sqlalchemy.orm import object_session
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList
+from sqlalchemy.sql import operators
+
+from extensions import db
+from models import MenuItem, Order, OrderItem, SyncTombstone, Table
+from order_api import ORDER_FIELDS, json_value
+
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 1000
+PRUNE_BATCH_SIZE = 1000
+# Rows written this long before commit get their sync timestamp stamped again at commit
+RESTAMP_AFTER_SECONDS = 1
+
+# Entity name -> (model, columns sent to terminals)
+ENTITIES = {
+    'orders': (Order, ORDER_FIELDS),
+    'order_items': (OrderItem, ('id', 'order_id', 'menu_item_id', 'quantity', 'price', 'status', 'notes',
+                                'created_at', 'updated_at')),
+    'tables': (Table, ('id', 'table_number', 'capacity', 'status', 'version', 'updated_at')),
+    'menu_items': (MenuItem, ('id', 'name', 'description', 'price', 'category', 'image_url', 'available',
+                              'updated_at')),
+}
+STREAMS = list(ENTITIES) + ['deleted']
+# Positions key holding the time the terminal is fully caught up to (None during a first full sync)
+SYNCED_AT = 'synced_at'
+# Table name -> column /api/sync reads changes by; only writes to these are stamped at commit
+SYNC_STAMPS = {model.__table__.name: model.__table__.c.updated_at for model, _columns in ENTITIES.values()}
+SYNC_STAMPS[SyncTombstone.__table__.name] = SyncTombstone.__table__.c.deleted_at
+
+
+class SyncCursorError(ValueError):
+    pass
+
+
+class TransactionTooLongError(RuntimeError):
+    pass
+
+
+def encode_sync_cursor(positions):
+    raw = {name: [positions[name][0].isoformat(), positions[name][1]] for name in STREAMS}
+    raw[SYNCED_AT] = positions[SYNCED_AT].isoformat() if positions[SYNCED_AT] else None
+    return base64.urlsafe_b64encode(json.dumps(raw).encode('utf-8')).decode('ascii')
+
+
+def decode_sync_cursor(cursor):
+    """Per-stream (timestamp, id) positions from a cursor string"""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        positions = {name: (datetime.fromisoformat(raw[name][0]), int(raw[name][1])) for name in STREAMS}
+        if SYNCED_AT in raw:
+            positions[SYNCED_AT] = datetime.fromisoformat(raw[SYNCED_AT]) if raw[SYNCED_AT] else None
+        else:
+            # Cursors issued before synced_at existed: the newest row seen is a safe lower bound
+            positions[SYNCED_AT] = max(positions[name][0] for name in STREAMS)
+        return positions
+    except (ValueError, KeyError, TypeError, IndexError, UnicodeError):
+        raise SyncCursorError('Invalid cursor')
+
+
+def initial_positions(since=None):
+    start = since or datetime.min
+    return {**{name: (start, 0) for name in STREAMS}, SYNCED_AT: since}
+
+
+def needs_resync(positions):
+    """True when deletions the terminal hasn't seen may already be pruned (SYNC_TOMBSTONE_DAYS)"""
+    synced_at = positions[SYNCED_AT]
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config['SYNC_TOMBSTONE_DAYS'])
+    return synced_at is not None and synced_at < cutoff
+
+
+def _after(ts_column, id_column, position, upto):
+    ts, row_id = position
+    return and_(
+        or_(ts_column > ts, and_(ts_column == ts, id_column > row_id)),
+        ts_column <= upto
+    )
+
+
+def sync_changes(positions, batch_size=None):
+    """Rows changed after each stream's position, at most batch_size per stream.
+
+    Each stream walks (updated_at, id) upwards, so the cursor only ever moves
+    forward. updated_at is stamped by the app, so rows changed in the last
+    SYNC_SETTLE_SECONDS are held back until a later poll. Slow transactions
+    stamp their rows again at commit, or are refused if they wrote rows they
+    can't name (see _stamp_at_commit). App servers' clocks must agree to well
+    within the settle time.
+    Returns (changes, new positions, has_more).
+    """
+    batch_size = max(1, min(batch_size or DEFAULT_BATCH_SIZE, MAX_BATCH_SIZE))
+    upto = datetime.utcnow() - timedelta(seconds=current_app.config.get('SYNC_SETTLE_SECONDS', 0))
+    changes, new_positions, has_more = {}, dict(positions), False
+
+    for name, (model, columns) in ENTITIES.items():
+        rows = db.session.execute(
+            select(*[getattr(model, c) for c in columns])
+            .where(_after(model.updated_at, model.id, positions[name], upto))
+            .order_by(model.updated_at, model.id)
+            .limit(batch_size + 1)
+        ).all()
+        if len(rows) > batch_size:
+            rows, has_more = rows[:batch_size], True
+        if rows:
+            new_positions[name] = (rows[-1].updated_at, rows[-1].id)
+        changes[name] = [{c: json_value(v) for c, v in row._asdict().items()} for row in rows]
+
+    tombstones = db.session.execute(
+        select(SyncTombstone.id, SyncTombstone.entity, SyncTombstone.entity_id, SyncTombstone.deleted_at)
+        .where(_after(SyncTombstone.deleted_at, SyncTombstone.id, positions['deleted'], upto))
+        .order_by(SyncTombstone.deleted_at, SyncTombstone.id)
+        .limit(batch_size + 1)
+    ).all()
+    if len(tombstones) > batch_size:
+        tombstones, has_more = tombstones[:batch_size], True
+    if tombstones:
+        new_positions['deleted'] = (tombstones[-1].deleted_at, tombstones[-1].id)
+    deleted = {name: [] for name in ENTITIES}
+    for row in tombstones:
+        deleted[row.entity].append(row.entity_id)
+    changes['deleted'] = deleted
+
+    if not has_more:
+        new_positions[SYNCED_AT] = upto
+    return changes, new_positions, has_more
+
+
+def prune_tombstones(batch_size=PRUNE_BATCH_SIZE):
+    """Delete tombstones older than SYNC_TOMBSTONE_DAYS, one committed batch at a time.
+
+    Terminals whose cursor is older than that are told to resync from scratch.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config['SYNC_TOMBSTONE_DAYS'])
+    pruned = 0
+    while True:
+        ids = db.session.scalars(
+            select(SyncTombstone.id).where(SyncTombstone.deleted_at < cutoff).order_by(SyncTombstone.id).limit(batch_size)
+        ).all()
+        if not ids:
+            return pruned
+        db.session.execute(delete(SyncTombstone).where(SyncTombstone.id.in_(ids)))
+        db.session.commit()
+        pruned += len(ids)
+
+
+def _record_deletion(entity):
+    def after_delete(mapper, connection, target):
+        result = connection.execute(insert(SyncTombstone.__table__).values(
+            entity=entity, entity_id=target.id, deleted_at=datetime.utcnow()
+        ))
+        session = object_session(target)
+        if session is not None:
+            _note_stamped(session, SyncTombstone.__table__, result.inserted_primary_key)
+    return after_delete
+
+
+# ORM deletes (including cascades) leave a tombstone in the same transaction
+for _name, (_model, _columns) in ENTITIES.items():
+    event.listen(_model, 'after_delete', _record_deletion(_name))
+
+
+
+
+def _note_stamped(session, table, ids):
+    """Remember rows this transaction stamped, so a slow commit can stamp them again"""
+    session.info.setdefault('sync_stamped_since', time.monotonic())
+    session.info.setdefault('sync_stamped', {}).setdefault(table.name, set()).update(ids)
+
+
+def _primary_keys(statement):
+    """Ids a Core/ORM UPDATE is limited to by `id == x` or `id IN (...)`, or None"""
+    id_column = statement.table.c.id
+    where = statement.whereclause
+    clauses = where.clauses if isinstance(where, BooleanClauseList) and where.operator is operators.and_ else [where]
+    for clause in clauses:
+        if not isinstance(clause, BinaryExpression) or not clause.left.compare(id_column):
+            continue
+        if not isinstance(clause.right, BindParameter) or clause.right.callable is not None:
+            continue
+        if clause.operator is operators.eq:
+            return [clause.right.value]
+        if clause.operator is operators.in_op:
+            return list(clause.right.value)
+    return None
+
+
+@event.listens_for(db.session, 'after_flush')
+def _note_flush(session, flush_context):
+    for obj in list(session.new) + list(session.dirty):
+        table = getattr(obj, '__table__', None)
+        if table is not None and table.name in SYNC_STAMPS and (obj in session.new or session.is_modified(obj)):
+            _note_stamped(session, table, [obj.id])
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _note_statement(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update):
+        return
+    table = getattr(orm_execute_state.statement, 'table', None)
+    if table is None or table.name not in SYNC_STAMPS:
+        return
+    params = orm_execute_state.parameters
+    ids = None
+    if orm_execute_state.is_update:
+        if isinstance(params, list):
+            # Bulk UPDATE by primary key: one parameter set per row
+            if params and all('id' in row for row in params):
+                ids = [row['id'] for row in params]
+        else:
+            ids = _primary_keys(orm_execute_state.statement)
+    if ids is not None:
+        _note_stamped(orm_execute_state.session, table, ids)
+    else:
+        # Rows we can't name (inserts, UPDATE ... WHERE status = ...) keep the stamp they got now
+        orm_execute_state.session.info.setdefault('sync_unstamped_since', time.monotonic())
+
+
+@event.listens_for(db.session, 'before_commit')
+def _stamp_at_commit(session):
+    """Move sync timestamps of a slow transaction's rows up to commit time.
+
+    /api/sync only trusts rows older than SYNC_SETTLE_SECONDS, so rows that sat
+    uncommitted longer than that would land behind a terminal's cursor. Rows
+    the session can name are stamped again here; a transaction that also wrote
+    rows it can't name and has run past SYNC_MAX_TRANSACTION_SECONDS is refused.
+    """
+    session.flush()
+    info = session.info
+    now = time.monotonic()
+    limit = current_app.config.get('SYNC_MAX_TRANSACTION_SECONDS', 0) if has_app_context() else 0
+    unstamped_since = info.get('sync_unstamped_since')
+    if unstamped_since is not None and limit > 0 and now - unstamped_since > limit:
+        raise TransactionTooLongError(
+            f'Changes to synced tables were held open longer than SYNC_MAX_TRANSACTION_SECONDS ({limit}s); '
+            '/api/sync could miss them, so they were not committed'
+        )
+    stamped_since = info.get('sync_stamped_since')
+    if stamped_since is None or now - stamped_since <= RESTAMP_AFTER_SECONDS:
+        return
+    stamp = datetime.utcnow()
+    connection = session.connection()
+    for table_name, ids in info['sync_stamped'].items():
+        column = SYNC_STAMPS[table_name]
+        ids = sorted(ids)
+        for start in range(0, len(ids), PRUNE_BATCH_SIZE):
+            connection.execute(
+                update(column.table).where(column.table.c.id.in_(ids[start:start + PRUNE_BATCH_SIZE]))
+                .values({column.name: stamp})
+            )
+
+
+def _clear_stamps(session):
+    for key in ('sync_stamped', 'sync_stamped_since', 'sync_unstamped_since'):
+        session.info.pop(key, None)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _clear_committed_stamps(session):
+    _clear_stamps(session)
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _clear_rolled_back_stamps(session, previous_transaction):
+    _clear_stamps(session)
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from extensions import db
+from models import MenuItem, Order, OrderItem
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+YIELD_PER = 1000
+CHUNK_BYTES = 64 * 1024
+
+EXPORT_COLUMNS = [
+    'order_id', 'order_created_at', 'order_status', 'table_id', 'customer_id', 'user_id', 'order_total',
+    'item_id', 'menu_item_id', 'menu_item_name', 'category', 'quantity', 'unit_price', 'line_total', 'item_status'
+]
+
+
+def iter_order_lines(date_from=None, date_to=None):
+    """Yield one dict per order line (or per empty order) using a server-side cursor.
+
+    yield_per keeps only one batch of rows in memory, so exporting a year of
+    history costs the same memory as exporting a day.
+    """
+    stmt = (
+        select(
+            Order.id.label('order_id'),
+            Order.created_at.label('order_created_at'),
+            Order.status.label('order_status'),
+            Order.table_id,
+            Order.customer_id,
+            Order.user_id,
+            Order.total_amount.label('order_total'),
+            OrderItem.id.label('item_id'),
+            OrderItem.menu_item_id,
+            MenuItem.name.label('menu_item_name'),
+            MenuItem.category,
+            OrderItem.quantity,
+            OrderItem.price.label('unit_price'),
+            OrderItem.status.label('item_status')
+        )
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(MenuItem, MenuItem.id == OrderItem.menu_item_id)
+        .order_by(Order.id, OrderItem.id)
+        .execution_options(stream_results=True, yield_per=YIELD_PER)
+    )
+    # Half-open date range on created_at
+    if date_from:
+        stmt = stmt.where(Order.created_at >= datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        stmt = stmt.where(Order.created_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+
+    for row in db.session.execute(stmt):
+        line = row._asdict()
+        if line['quantity'] is not None:
+            line['line_total'] = line['unit_price'] * line['quantity']
+        else:
+            line['line_total'] = None
+        yield line
+
+
+def _csv_chunks(lines):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for line in lines:
+        writer.writerow(line)
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _jsonl_chunks(lines):
+    parts, size = [], 0
+    for line in lines:
+        text = json.dumps({column: line[column] for column in EXPORT_COLUMNS}, default=str) + '\n'
+        parts.append(text)
+        size += len(text)
+        if size >= CHUNK_BYTES:
+            yield ''.join(parts)
+            parts, size = [], 0
+    yield ''.join(parts)
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(export_format='csv', compress=False, date_from=None, date_to=None):
+    """Encoded byte chunks of the order export, ready for a streaming response or a file"""
+    lines = iter_order_lines(date_from, date_to)
+    text_chunks = _csv_chunks(lines) if export_format == 'csv' else _jsonl_chunks(lines)
+    chunks = (chunk.encode('utf-8') for chunk in text_chunks if chunk)
+    return _gzip(chunks) if compress else chunks
+
+
+def export_filename(export_format, compress, date_from=None, date_to=None):
+    span = '_'.join(d.isoformat() for d in (date_from, date_to) if d) or 'all'
+    return f'orders_{span}.{export_format}' + ('.gz' if compress else '')
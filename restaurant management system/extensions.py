@@ -1,10 +1,13 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect, generate_csrf
 import os
 from dotenv import load_dotenv
 
+from db_pool import engine_options_from_env
+
 # Load environment variables
 load_dotenv()
 
@@ -16,13 +19,102 @@ app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-key-for-testing')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'mysql://root:@localhost/restaurant_db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Connection pool sizing, recycling and pre-ping (DB_POOL_* environment variables)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options_from_env(app.config['SQLALCHEMY_DATABASE_URI'])
+
 # WTF CSRF configuration
 app.config['WTF_CSRF_ENABLED'] = True
 app.config['WTF_CSRF_TIME_LIMIT'] = 3600  # 1 hour
 
+# Dashboard statistics cache lifetime in seconds (0 disables caching)
+app.config['DASHBOARD_STATS_TTL'] = int(os.getenv('DASHBOARD_STATS_TTL', '30'))
+
+# Upper bound in seconds on how stale another worker's menu catalog can get
+app.config['MENU_CACHE_TTL'] = int(os.getenv('MENU_CACHE_TTL', '300'))
+
+# Upper bound in seconds on how stale another worker's floor map (/api/tables) can get
+app.config['FLOOR_MAP_TTL'] = int(os.getenv('FLOOR_MAP_TTL', '5'))
+
+# Opt-in per-request SQL profiling (query counts, Server-Timing headers, slow query log)
+app.config['QUERY_PROFILING'] = os.getenv('QUERY_PROFILING', '').lower() in ('1', 'true', 'yes')
+app.config['SLOW_QUERY_MS'] = int(os.getenv('SLOW_QUERY_MS', '100'))
+
+# Reservation seating time by party size, e.g. "2:90,4:105,6:120,*:150"
+# (parties up to 2 hold a table for 90 minutes, larger parties fall through)
+def _parse_seating_minutes(value):
+    rules = []
+    for rule in value.split(','):
+        max_party, minutes = rule.split(':')
+        rules.append((None if max_party.strip() == '*' else int(max_party), int(minutes)))
+    return rules
+
+app.config['RESERVATION_SEATING_MINUTES'] = _parse_seating_minutes(os.getenv('RESERVATION_SEATING_MINUTES', '2:90,4:105,6:120,*:150'))
+app.config['RESERVATION_INDEX_TTL'] = int(os.getenv('RESERVATION_INDEX_TTL', '60'))
+# Days of availability indexes kept per process, least recently used dropped first
+app.config['RESERVATION_INDEX_DAYS'] = int(os.getenv('RESERVATION_INDEX_DAYS', '60'))
+
+# 'immediate' deducts recipe ingredients when an order completes; 'deferred' leaves it
+# to `flask inventory deplete` (run per shift) to keep order completion as fast as possible
+app.config['INVENTORY_DEPLETION'] = os.getenv('INVENTORY_DEPLETION', 'immediate')
+
+# How long another worker's customer edits can be missing from this process's search index
+app.config['CUSTOMER_INDEX_TTL'] = int(os.getenv('CUSTOMER_INDEX_TTL', '300'))
+
+# Logged-in users are cached per process; role or password changes made by
+# another worker apply within USER_CACHE_TTL seconds (0 loads on every request)
+app.config['USER_CACHE_TTL'] = int(os.getenv('USER_CACHE_TTL', '60'))
+app.config['USER_CACHE_SIZE'] = int(os.getenv('USER_CACHE_SIZE', '1000'))
+
+# Password hashing runs in a small per-process pool so a burst of logins can't
+# occupy every request thread; attempts beyond the queue get a 503
+app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', '2'))
+app.config['PASSWORD_HASH_QUEUE'] = int(os.getenv('PASSWORD_HASH_QUEUE', '16'))
+app.config['PASSWORD_HASH_TIMEOUT'] = float(os.getenv('PASSWORD_HASH_TIMEOUT', '5'))
+
+# Login attempts allowed per client IP and per username, as "attempts/seconds"
+app.config['LOGIN_RATE_PER_IP'] = os.getenv('LOGIN_RATE_PER_IP', '30/60')
+app.config['LOGIN_RATE_PER_USERNAME'] = os.getenv('LOGIN_RATE_PER_USERNAME', '5/60')
+
+# /api/sync holds back rows changed within this many seconds so transactions still
+# committing can't land behind a terminal's cursor
+app.config['SYNC_SETTLE_SECONDS'] = int(os.getenv('SYNC_SETTLE_SECONDS', '5'))
+# Transactions that wrote synced rows they can't re-stamp at commit (bulk inserts,
+# UPDATE ... WHERE status = ...) and ran longer than this are refused (0 disables);
+# keep it below SYNC_SETTLE_SECONDS or /api/sync can miss their rows
+app.config['SYNC_MAX_TRANSACTION_SECONDS'] = int(os.getenv('SYNC_MAX_TRANSACTION_SECONDS', '4'))
+# Deletion tombstones kept for /api/sync; older cursors get 410 and must resync from scratch
+app.config['SYNC_TOMBSTONE_DAYS'] = int(os.getenv('SYNC_TOMBSTONE_DAYS', '30'))
+
+# Kitchen station per menu category, e.g. "appetizer:cold,main:grill"; other categories go to "kitchen"
+def _parse_stations(value):
+    return dict(
+        (category.strip(), station.strip())
+        for category, station in (rule.split(':') for rule in value.split(',') if rule.strip())
+    )
+
+app.config['KITCHEN_STATIONS'] = _parse_stations(os.getenv('KITCHEN_STATIONS', 'appetizer:cold,main:grill,dessert:pastry,beverage:bar'))
+# How long another worker's kitchen changes can be missing from this process's fire queue
+app.config['KITCHEN_QUEUE_TTL'] = int(os.getenv('KITCHEN_QUEUE_TTL', '30'))
+
+# Responses of at least COMPRESS_MIN_SIZE bytes are sent gzip/brotli compressed (0 disables);
+# brotli is used when the optional Brotli package is installed
+app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+app.config['COMPRESS_GZIP_LEVEL'] = int(os.getenv('COMPRESS_GZIP_LEVEL', '6'))
+app.config['COMPRESS_BROTLI_QUALITY'] = int(os.getenv('COMPRESS_BROTLI_QUALITY', '5'))
+# Compressed bodies kept for responses with a strong ETag (static files, /api/menu, /api/tables)
+app.config['COMPRESS_CACHE_SIZE'] = int(os.getenv('COMPRESS_CACHE_SIZE', '256'))
+
+# Rendered list rows/cards kept per process, keyed by row id and updated_at (0 disables)
+app.config['FRAGMENT_CACHE_SIZE'] = int(os.getenv('FRAGMENT_CACHE_SIZE', '5000'))
+# Where compiled templates are cached between restarts (default: the system temp directory)
+app.config['TEMPLATE_CACHE_DIR'] = os.getenv('TEMPLATE_CACHE_DIR') or None
+
 # Initialize database
 db = SQLAlchemy(app)
 
+# Initialize schema migrations (flask db upgrade)
+migrate = Migrate(app, db)
+
 # Initialize CSRF protection
 csrf = CSRFProtect(app)
 
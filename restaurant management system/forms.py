@@ -1,6 +1,7 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, SubmitField, BooleanField, SelectField, FloatField, IntegerField, TextAreaField, DateField, TimeField
-from wtforms.validators import DataRequired, Email, Length, EqualTo, ValidationError, NumberRange
+from wtforms import StringField, PasswordField, SubmitField, BooleanField, SelectField, FloatField, DecimalField, IntegerField, TextAreaField, DateField, TimeField
+from wtforms.widgets import HiddenInput
+from wtforms.validators import DataRequired, Email, Length, EqualTo, ValidationError, NumberRange, Optional
 from models import User, Table, Customer
 from datetime import datetime
 
@@ -43,7 +44,7 @@ class CustomerForm(FlaskForm):
 class MenuItemForm(FlaskForm):
     name = StringField('Item Name', validators=[DataRequired(), Length(max=100)])
     description = TextAreaField('Description')
-    price = FloatField('Price', validators=[DataRequired(), NumberRange(min=0)])
+    price = DecimalField('Price', places=2, validators=[DataRequired(), NumberRange(min=0)])
     category = SelectField('Category', choices=[
         ('appetizer', 'Appetizer'),
         ('main', 'Main Course'),
@@ -62,6 +63,7 @@ class TableForm(FlaskForm):
         ('occupied', 'Occupied'),
         ('reserved', 'Reserved')
     ], validators=[DataRequired()])
+    version = IntegerField(widget=HiddenInput(), validators=[Optional()])
     submit = SubmitField('Save Table')
     
     def validate_table_number(self, table_number):
@@ -72,7 +74,7 @@ class TableForm(FlaskForm):
 class ReservationForm(FlaskForm):
     table_id = SelectField('Table', coerce=int, validators=[DataRequired()])
     customer_name = StringField('Customer Name', validators=[DataRequired(), Length(max=100)])
-    customer_email = StringField('Email', validators=[Email()])
+    customer_email = StringField('Email', validators=[Optional(), Email()])
     customer_phone = StringField('Phone', validators=[DataRequired(), Length(max=20)])
     party_size = IntegerField('Party Size', validators=[DataRequired(), NumberRange(min=1)])
     reservation_date = DateField('Date', validators=[DataRequired()], format='%Y-%m-%d')
@@ -88,9 +90,15 @@ class ReservationForm(FlaskForm):
     
     def validate_party_size(self, party_size):
         if hasattr(self, 'table_id') and self.table_id.data:
-            table = Table.query.get(self.table_id.data)
-            if table and party_size.data > table.capacity:
-                raise ValidationError(f'Party size exceeds table capacity ({table.capacity}).')
+            # Views that already loaded the tables pass their capacities in to skip the query
+            capacities = getattr(self, 'table_capacities', None)
+            if capacities is not None:
+                capacity = capacities.get(self.table_id.data)
+            else:
+                table = Table.query.get(self.table_id.data)
+                capacity = table.capacity if table else None
+            if capacity is not None and party_size.data > capacity:
+                raise ValidationError(f'Party size exceeds table capacity ({capacity}).')
 
 class OrderForm(FlaskForm):
     table_id = SelectField('Table', coerce=int, validators=[DataRequired()])
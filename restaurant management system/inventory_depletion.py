@@ -0,0 +1,121 @@
+from datetime import datetime
+
+from sqlalchemy import case, func, select, update
+
+from extensions import db
+from models import Inventory, Order, OrderItem, RecipeIngredient
+
+BATCH_SIZE = 1000
+
+
+class DepletionResult:
+    def __init__(self):
+        self.orders = 0
+        self.ingredients = 0
+        self.low_stock = []  # dicts for items that crossed their reorder level in this pass
+
+    def merge(self, other):
+        self.orders += other.orders
+        self.ingredients += other.ingredients
+        self.low_stock.extend(other.low_stock)
+
+
+def deplete_orders(order_ids):
+    """Deduct recipe ingredients for the given orders, skipping any already deducted.
+
+    Each order is claimed first by stamping inventory_depleted_at where it is
+    still NULL; only orders whose claim changed a row are deducted, so two
+    requests completing the same order can never both deduct it. Runs inside
+    the caller's transaction.
+    """
+    now = datetime.utcnow()
+    claimed = []
+    for order_id in order_ids:
+        # One statement per order: rowcount tells exactly which claims won
+        if db.session.execute(
+            update(Order)
+            .where(Order.id == order_id, Order.inventory_depleted_at.is_(None))
+            .values(inventory_depleted_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount:
+            claimed.append(order_id)
+    return _deplete_claimed(claimed)
+
+
+def _deplete_claimed(order_ids):
+    """Deduct stock for orders this transaction has already stamped, in one set-based pass.
+
+    Usage is aggregated per ingredient in a single grouped SELECT and stock is
+    decremented with a single UPDATE ... CASE.
+    """
+    result = DepletionResult()
+    if not order_ids:
+        return result
+
+    usage = (
+        select(
+            RecipeIngredient.inventory_id,
+            func.sum(OrderItem.quantity * RecipeIngredient.quantity).label('used')
+        )
+        .join(OrderItem, OrderItem.menu_item_id == RecipeIngredient.menu_item_id)
+        .where(OrderItem.order_id.in_(order_ids))
+        .group_by(RecipeIngredient.inventory_id)
+        .subquery()
+    )
+    rows = db.session.execute(
+        select(Inventory.id, Inventory.name, Inventory.unit, Inventory.quantity, Inventory.reorder_level, usage.c.used)
+        .join(usage, usage.c.inventory_id == Inventory.id)
+    ).all()
+
+    if rows:
+        used = {row.id: row.used for row in rows}
+        db.session.execute(
+            update(Inventory)
+            .where(Inventory.id.in_(used))
+            .values(quantity=Inventory.quantity - case(used, value=Inventory.id, else_=0))
+            .execution_options(synchronize_session=False)
+        )
+        for row in rows:
+            remaining = row.quantity - row.used
+            if row.quantity > row.reorder_level >= remaining:
+                result.low_stock.append({
+                    'id': row.id,
+                    'name': row.name,
+                    'unit': row.unit,
+                    'quantity': remaining,
+                    'reorder_level': row.reorder_level
+                })
+
+    result.orders = len(order_ids)
+    result.ingredients = len(rows)
+    return result
+
+
+def deplete_pending_orders(batch_size=BATCH_SIZE):
+    """Deduct stock for every completed order not yet processed, e.g. at the end of a shift.
+
+    Each batch is committed on its own so a long backlog never holds locks for long.
+    """
+    total = DepletionResult()
+    while True:
+        order_ids = db.session.scalars(
+            select(Order.id)
+            .where(Order.status == 'completed', Order.inventory_depleted_at.is_(None))
+            .order_by(Order.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not order_ids:
+            break
+        # The rows are locked and unstamped, so one UPDATE claims the whole batch
+        claimed = db.session.execute(
+            update(Order)
+            .where(Order.id.in_(order_ids), Order.inventory_depleted_at.is_(None))
+            .values(inventory_depleted_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        result = _deplete_claimed(order_ids)
+        result.orders = claimed
+        total.merge(result)
+        db.session.commit()
+    return total
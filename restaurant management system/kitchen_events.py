@@ -0,0 +1,133 @@
+import itertools
+import json
+import logging
+import queue
+import threading
+from collections import deque
+
+from sqlalchemy import event
+
+from extensions import db
+
+ITEM_STATUSES = ['pending', 'preparing', 'ready', 'served']
+HEARTBEAT_SECONDS = 15
+
+logger = logging.getLogger(__name__)
+
+
+class EventHub:
+    """In-process publish/subscribe hub for kitchen display events.
+
+    Each subscriber gets its own bounded queue; a screen that stops reading
+    loses its oldest events instead of blocking publishers. A short replay
+    buffer lets reconnecting clients resume from their Last-Event-ID. Events
+    are only seen by subscribers connected to the same worker process.
+    """
+
+    def __init__(self, replay_size=256, queue_size=512):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._subscribers = set()
+        self._listeners = []
+        self._recent = deque(maxlen=replay_size)
+        self._queue_size = queue_size
+
+    def subscribe(self, last_event_id=None):
+        q = queue.Queue(maxsize=self._queue_size)
+        with self._lock:
+            if last_event_id is not None:
+                for message in self._recent:
+                    if message[0] > last_event_id:
+                        q.put_nowait(message)
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def add_listener(self, fn):
+        """Call fn(event_type, data) synchronously for every published event"""
+        self._listeners.append(fn)
+
+    def publish(self, event_type, data):
+        with self._lock:
+            message = (next(self._ids), event_type, data)
+            self._recent.append(message)
+            subscribers = list(self._subscribers)
+        for fn in self._listeners:
+            try:
+                fn(event_type, data)
+            except Exception:
+                # Events are published after commit; a failing listener must not break the request
+                logger.exception('Kitchen event listener failed for %s', event_type)
+        for q in subscribers:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                # Drop the oldest event for a slow screen rather than stall the request
+                try:
+                    q.get_nowait()
+                    q.put_nowait(message)
+                except (queue.Empty, queue.Full):
+                    pass
+
+
+hub = EventHub()
+
+
+def format_sse(message):
+    event_id, event_type, data = message
+    return f'id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data, default=str)}\n\n'
+
+
+def stream(last_event_id=None):
+    """Generator of SSE frames for one connected kitchen screen"""
+    q = hub.subscribe(last_event_id)
+    try:
+        yield 'retry: 3000\n\n'
+        while True:
+            try:
+                yield format_sse(q.get(timeout=HEARTBEAT_SECONDS))
+            except queue.Empty:
+                yield ': heartbeat\n\n'
+    finally:
+        hub.unsubscribe(q)
+
+
+def queue_event(event_type, data):
+    """Publish an event once the current transaction commits"""
+    db.session.info.setdefault('kitchen_events', []).append((event_type, data))
+
+
+def order_event_data(order):
+    return {
+        'order_id': order.id,
+        'table_id': order.table_id,
+        'status': order.status
+    }
+
+
+def item_event_data(item, menu_item_name=None, category=None):
+    # Listeners run after commit and must not query, so the event carries what they route on
+    return {
+        'id': item.id,
+        'order_id': item.order_id,
+        'menu_item_id': item.menu_item_id,
+        'name': menu_item_name,
+        'category': category,
+        'quantity': item.quantity,
+        'notes': item.notes,
+        'status': item.status
+    }
+
+
+@event.listens_for(db.session, 'after_commit')
+def _publish_queued_events(session):
+    for event_type, data in session.info.pop('kitchen_events', []):
+        hub.publish(event_type, data)
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_queued_events(session, previous_transaction):
+    session.info.pop('kitchen_events', None)
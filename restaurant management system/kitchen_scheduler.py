@@ -0,0 +1,347 @@
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from extensions import db
+from models import MenuItem, Order, OrderItem
+from kitchen_events import hub, item_event_data, queue_event
+
+# Courses fire in this order within an order; course 0 (drinks) is never held back
+COURSE_BY_CATEGORY = {'beverage': 0, 'appetizer': 1, 'main': 2, 'dessert': 3}
+DEFAULT_COURSE = 2
+DEFAULT_STATION = 'kitchen'
+OPEN_ORDER_STATUSES = ('pending', 'preparing', 'served')
+# Items still being worked on; they hold back later courses of their order
+OUTSTANDING_STATUSES = ('pending', 'preparing')
+EPOCH = datetime(1970, 1, 1)
+
+
+class Ticket:
+    __slots__ = ('id', 'order_id', 'menu_item_id', 'name', 'category', 'quantity', 'station', 'course', 'status',
+                 'released_at')
+
+    def __init__(self, id, order_id, menu_item_id, name, category, quantity, station, course, status):
+        self.id = id
+        self.order_id = order_id
+        self.menu_item_id = menu_item_id
+        self.name = name
+        self.category = category
+        self.quantity = quantity
+        self.station = station
+        self.course = course
+        self.status = status
+        self.released_at = None
+
+
+class FireGroup:
+    """Released pending tickets for one menu item at one station, fired together"""
+
+    def __init__(self, station, menu_item_id, name, category):
+        self.station = station
+        self.menu_item_id = menu_item_id
+        self.name = name
+        self.category = category
+        self.tickets = {}  # ticket id -> Ticket
+        self.priority = None  # oldest release time, kept up to date so dispatch never scans
+
+    def add(self, ticket):
+        self.tickets[ticket.id] = ticket
+        if self.priority is None or ticket.released_at < self.priority:
+            self.priority = ticket.released_at
+
+    def remove(self, ticket_id):
+        ticket = self.tickets.pop(ticket_id)
+        if not self.tickets:
+            self.priority = None
+        elif ticket.released_at == self.priority:
+            self.priority = min(t.released_at for t in self.tickets.values())
+
+    def to_dict(self):
+        tickets = sorted(self.tickets.values(), key=lambda t: (t.released_at, t.id))
+        return {
+            'station': self.station,
+            'menu_item_id': self.menu_item_id,
+            'name': self.name,
+            'category': self.category,
+            'quantity': sum(t.quantity for t in tickets),
+            'item_ids': [t.id for t in tickets],
+            'order_ids': sorted({t.order_id for t in tickets}),
+            'waiting_since': datetime.utcfromtimestamp(self.priority).isoformat()
+        }
+
+
+class KitchenScheduler:
+    """Per-station priority queues of fire groups with course sequencing per order.
+
+    Each station keeps a heap of (oldest release time, seq, menu item) entries.
+    Entries are never updated in place: when a group changes, a fresh entry is
+    pushed and stale ones are skipped when they reach the top, so adding,
+    removing and dispatching tickets are all O(log n).
+    """
+
+    def __init__(self, stations):
+        self.stations = stations  # category -> station
+        self.built_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._tickets = {}  # ticket id -> Ticket
+        self._orders = {}  # order id -> {course: [ticket ids]} of outstanding tickets
+        self._groups = {}  # (station, menu_item_id) -> FireGroup
+        self._heaps = {}  # station -> [(priority, seq, menu_item_id)]
+
+    def _station(self, category):
+        return self.stations.get(category, DEFAULT_STATION)
+
+    def _current_course(self, order_id):
+        # Lowest course with outstanding work, ignoring course 0
+        courses = [c for c, ids in self._orders.get(order_id, {}).items() if c > 0 and ids]
+        return min(courses) if courses else None
+
+    def _is_released(self, ticket):
+        current = self._current_course(ticket.order_id)
+        return ticket.course == 0 or current is None or ticket.course <= current
+
+    def _push(self, group):
+        heapq.heappush(self._heaps.setdefault(group.station, []), (group.priority, next(self._seq), group.menu_item_id))
+
+    def _enqueue(self, ticket, now):
+        if ticket.released_at is None:
+            ticket.released_at = now
+        key = (ticket.station, ticket.menu_item_id)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = FireGroup(ticket.station, ticket.menu_item_id, ticket.name, ticket.category)
+        old_priority = group.priority
+        group.add(ticket)
+        # Every queued group keeps one heap entry at its current priority; older entries go stale
+        if group.priority != old_priority:
+            self._push(group)
+
+    def _dequeue(self, ticket):
+        key = (ticket.station, ticket.menu_item_id)
+        group = self._groups.get(key)
+        if group is None or ticket.id not in group.tickets:
+            return
+        old_priority = group.priority
+        group.remove(ticket.id)
+        if not group.tickets:
+            del self._groups[key]
+        elif group.priority != old_priority:
+            self._push(group)
+
+    def _release_waiting(self, order_id, now):
+        current = self._current_course(order_id)
+        for course, ids in self._orders.get(order_id, {}).items():
+            if current is None or course <= current:
+                for ticket_id in ids:
+                    ticket = self._tickets[ticket_id]
+                    if ticket.status == 'pending' and ticket.released_at is None:
+                        self._enqueue(ticket, now)
+
+    def _add(self, ticket, now):
+        self._tickets[ticket.id] = ticket
+        self._orders.setdefault(ticket.order_id, {}).setdefault(ticket.course, []).append(ticket.id)
+        if ticket.status == 'pending' and self._is_released(ticket):
+            self._enqueue(ticket, now)
+
+    def _finish(self, ticket, now):
+        """Ticket is ready, served or gone: it no longer holds back later courses"""
+        self._dequeue(ticket)
+        self._tickets.pop(ticket.id, None)
+        courses = self._orders.get(ticket.order_id, {})
+        if ticket.id in courses.get(ticket.course, []):
+            courses[ticket.course].remove(ticket.id)
+            if not courses[ticket.course]:
+                del courses[ticket.course]
+        if not courses:
+            self._orders.pop(ticket.order_id, None)
+        else:
+            self._release_waiting(ticket.order_id, now)
+
+    def load(self, rows):
+        """Build from (id, order_id, menu_item_id, name, category, quantity, status, created_at) rows"""
+        with self._lock:
+            created = {}
+            for row in rows:
+                created[row.id] = (row.created_at - EPOCH).total_seconds()
+                ticket = Ticket(row.id, row.order_id, row.menu_item_id, row.name, row.category, row.quantity,
+                                self._station(row.category), COURSE_BY_CATEGORY.get(row.category, DEFAULT_COURSE),
+                                row.status)
+                self._tickets[ticket.id] = ticket
+                self._orders.setdefault(ticket.order_id, {}).setdefault(ticket.course, []).append(ticket.id)
+            # Items already waiting keep their place in line
+            for ticket in sorted(self._tickets.values(), key=lambda t: t.id):
+                if ticket.status == 'pending' and self._is_released(ticket):
+                    self._enqueue(ticket, created[ticket.id])
+
+    def item_added(self, data):
+        with self._lock:
+            if data['id'] in self._tickets or data['status'] not in OUTSTANDING_STATUSES:
+                return
+            category = data.get('category')
+            self._add(Ticket(
+                data['id'], data['order_id'], data['menu_item_id'], data['name'], category, data['quantity'],
+                self._station(category), COURSE_BY_CATEGORY.get(category, DEFAULT_COURSE), data['status']
+            ), time.time())
+
+    def item_status(self, item_id, status):
+        with self._lock:
+            ticket = self._tickets.get(item_id)
+            if ticket is None:
+                return
+            if status in OUTSTANDING_STATUSES:
+                ticket.status = status
+                if status == 'preparing':
+                    self._dequeue(ticket)
+                elif self._is_released(ticket):
+                    self._enqueue(ticket, time.time())
+            else:
+                self._finish(ticket, time.time())
+
+    def order_closed(self, order_id):
+        with self._lock:
+            for ids in list(self._orders.get(order_id, {}).values()):
+                for ticket_id in list(ids):
+                    self._dequeue(self._tickets.pop(ticket_id))
+            self._orders.pop(order_id, None)
+
+    def peek_next(self, station, skip=()):
+        """The station's longest-waiting group as a dict, leaving it queued; None when empty.
+
+        Groups in `skip` (menu item ids) are passed over. Fired items leave
+        the queue through their item.status events once the firing
+        transaction has committed, never before.
+        """
+        with self._lock:
+            heap = self._heaps.get(station, [])
+            while heap:
+                priority, _, menu_item_id = heap[0]
+                group = self._groups.get((station, menu_item_id))
+                if group is not None and priority == group.priority:
+                    break
+                heapq.heappop(heap)  # Stale entry
+            if not heap:
+                return None
+            if heap[0][2] not in skip:
+                return self._groups[(station, heap[0][2])].to_dict()
+            # Only after a group turned out to be taken by another worker: scan the station
+            groups = [g for (s, menu_item_id), g in self._groups.items() if s == station and menu_item_id not in skip]
+            return min(groups, key=lambda g: g.priority).to_dict() if groups else None
+
+    def peek(self, station, limit):
+        with self._lock:
+            groups = heapq.nsmallest(
+                limit, (g for (s, _), g in self._groups.items() if s == station), key=lambda g: g.priority
+            )
+            return [g.to_dict() for g in groups]
+
+    def summary(self):
+        with self._lock:
+            stations = {}
+            for (station, _), group in self._groups.items():
+                entry = stations.setdefault(station, {'groups': 0, 'items': 0})
+                entry['groups'] += 1
+                entry['items'] += sum(t.quantity for t in group.tickets.values())
+            return stations
+
+
+_lock = threading.Lock()
+_scheduler = None
+
+
+def _load_scheduler():
+    scheduler = KitchenScheduler(current_app.config['KITCHEN_STATIONS'])
+    scheduler.load(db.session.execute(
+        select(
+            OrderItem.id, OrderItem.order_id, OrderItem.menu_item_id, MenuItem.name, MenuItem.category,
+            OrderItem.quantity, OrderItem.status, OrderItem.created_at
+        )
+        .join(MenuItem, MenuItem.id == OrderItem.menu_item_id)
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(OrderItem.status.in_(OUTSTANDING_STATUSES), Order.status.in_(OPEN_ORDER_STATUSES))
+    ).all())
+    return scheduler
+
+
+def get_scheduler():
+    """Return the process's scheduler, rebuilt from the database once KITCHEN_QUEUE_TTL runs out.
+
+    Changes made in this process arrive through kitchen events straight away;
+    the rebuild picks up other workers' changes. Firing re-checks every item
+    in the database, so a stale queue can't fire an item twice.
+    """
+    global _scheduler
+    ttl = current_app.config.get('KITCHEN_QUEUE_TTL', 0)
+    scheduler = _scheduler
+    if scheduler is not None and time.monotonic() - scheduler.built_at < ttl:
+        return scheduler
+    scheduler = _load_scheduler()
+    with _lock:
+        _scheduler = scheduler
+    return scheduler
+
+
+def fire_next(station):
+    """Fire the station's next group: mark its still-pending items preparing.
+
+    Returns the fired group as a dict, or None when the station has nothing
+    waiting. Groups whose items were all taken meanwhile are skipped. The
+    caller owns the commit; the queue itself only changes once the item.status
+    events are published after it, so a rolled-back fire leaves it intact.
+    """
+    scheduler = get_scheduler()
+    skip = set()
+    while True:
+        group = scheduler.peek_next(station, skip)
+        if group is None:
+            return None
+        items = db.session.scalars(
+            select(OrderItem)
+            .where(OrderItem.id.in_(group['item_ids']), OrderItem.status == 'pending')
+            .order_by(OrderItem.id)
+            .with_for_update()
+        ).all()
+        if items:
+            break
+        skip.add(group['menu_item_id'])
+
+    for item in items:
+        item.status = 'preparing'
+    db.session.execute(
+        update(Order)
+        .where(Order.id.in_({item.order_id for item in items}))
+        .values(updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.session.flush()
+    for item in items:
+        queue_event('item.status', item_event_data(item, group['name'], group['category']))
+
+    return {
+        **group,
+        'quantity': sum(item.quantity for item in items),
+        'item_ids': [item.id for item in items],
+        'order_ids': sorted({item.order_id for item in items})
+    }
+
+
+def _on_kitchen_event(event_type, data):
+    scheduler = _scheduler
+    if scheduler is None:
+        return
+    if event_type == 'item.added':
+        scheduler.item_added(data)
+    elif event_type == 'item.status':
+        scheduler.item_status(data['id'], data['status'])
+    elif event_type == 'item.removed':
+        scheduler.item_status(data['id'], 'removed')
+    elif event_type == 'order.status' and data['status'] not in OPEN_ORDER_STATUSES:
+        scheduler.order_closed(data['order_id'])
+
+
+hub.add_listener(_on_kitchen_event)
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import threading
+import time
+
+from flask import current_app
+
+from models import MenuItem
+
+_lock = threading.Lock()
+_version = 0
+_catalog = None
+
+
+class MenuCatalog:
+    """Immutable snapshot of the menu built once per menu version"""
+
+    def __init__(self, version, items):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.items = items
+        self.by_id = {item['id']: item for item in items}
+        self.available_items = [item for item in items if item['available']]
+
+        api_data = [{
+            'id': item['id'],
+            'name': item['name'],
+            'description': item['description'],
+            'price': float(item['price']),
+            'category': item['category'],
+            'image_url': item['image_url']
+        } for item in self.available_items]
+        self.api_json = json.dumps(api_data, separators=(',', ':')).encode('utf-8')
+        # Content hash, so every worker process hands out the same ETag for the same menu
+        self.etag = hashlib.sha1(self.api_json).hexdigest()
+
+        self.order_choices = [
+            (item['id'], f"{item['name']} (${item['price']:.2f})") for item in self.available_items
+        ]
+
+    def get_available(self, menu_item_id):
+        item = self.by_id.get(menu_item_id)
+        return item if item and item['available'] else None
+
+
+def _load_items():
+    return [{
+        'id': item.id,
+        'name': item.name,
+        'description': item.description,
+        'price': item.price,
+        'category': item.category,
+        'image_url': item.image_url,
+        'available': item.available,
+        'updated_at': item.updated_at
+    } for item in MenuItem.query.order_by(MenuItem.id).all()]
+
+
+def get_catalog():
+    """Return the current catalog, rebuilding it when the version changed or the TTL ran out.
+
+    Other worker processes don't see this process's version bumps, so
+    MENU_CACHE_TTL bounds how long they can serve a stale menu.
+    """
+    global _catalog
+    ttl = current_app.config.get('MENU_CACHE_TTL', 0)
+    with _lock:
+        catalog, version = _catalog, _version
+    if catalog and catalog.version == version and time.monotonic() - catalog.built_at < ttl:
+        return catalog
+
+    catalog = MenuCatalog(version, _load_items())
+    with _lock:
+        # Don't overwrite a snapshot for a newer version built concurrently
+        if _catalog is None or _catalog.version <= catalog.version:
+            _catalog = catalog
+    return catalog
+
+
+def bump_menu_version():
+    global _version
+    with _lock:
+        _version += 1
@@ -0,0 +1,26 @@
+"""add reservation date index
+
+Used to load one day's bookings into the reservation availability index.
+
+Revision ID: 3c5f1b7e2a90
+Revises: 940e9a74839c
+Create Date: 2026-10-17 10:02:11.407326
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c5f1b7e2a90'
+down_revision = '940e9a74839c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('idx_reservation_date', 'reservation', ['reservation_date'])
+
+
+def downgrade():
+    op.drop_index('idx_reservation_date', table_name='reservation')
@@ -0,0 +1,56 @@
+"""add updated_at to order items, tables and menu items plus sync tombstones
+
+Revision ID: 4d9e61b3f2a8
+Revises: e2b7a4c90d15
+Create Date: 2026-10-17 13:22:47.902614
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d9e61b3f2a8'
+down_revision = 'e2b7a4c90d15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table_name in ('menu_item', 'table', 'order_item'):
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    # Existing rows count as changed when they were created (tables have no created_at)
+    for table_name in ('menu_item', 'order_item'):
+        rows = sa.table(table_name, sa.column('created_at'), sa.column('updated_at'))
+        op.execute(rows.update().values(updated_at=rows.c.created_at))
+    tables = sa.table('table', sa.column('updated_at'))
+    # UTC like every app-stamped updated_at; CURRENT_TIMESTAMP is the server's local time on MySQL
+    op.execute(tables.update().values(updated_at=datetime.utcnow()))
+
+    op.create_index('idx_menu_item_updated_at', 'menu_item', ['updated_at'])
+    op.create_index('idx_table_updated_at', 'table', ['updated_at'])
+    op.create_index('idx_order_item_updated_at', 'order_item', ['updated_at'])
+
+    op.create_table('sync_tombstone',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_sync_tombstone_deleted_at', 'sync_tombstone', ['deleted_at'])
+
+
+def downgrade():
+    op.drop_index('idx_sync_tombstone_deleted_at', table_name='sync_tombstone')
+    op.drop_table('sync_tombstone')
+    op.drop_index('idx_order_item_updated_at', table_name='order_item')
+    op.drop_index('idx_table_updated_at', table_name='table')
+    op.drop_index('idx_menu_item_updated_at', table_name='menu_item')
+    for table_name in ('order_item', 'table', 'menu_item'):
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,39 @@
+"""add daily sales rollup
+
+Populate it for existing history with ``flask reports backfill``.
+
+Revision ID: 5a8c3e91d4f7
+Revises: 7e4d09c2b6a1
+Create Date: 2026-10-17 11:20:36.774190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a8c3e91d4f7'
+down_revision = '7e4d09c2b6a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_sales',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('menu_item_id', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_item.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day', 'menu_item_id', name='uq_daily_sales_day_item')
+    )
+    op.create_index('idx_daily_sales_day_category', 'daily_sales', ['day', 'category'])
+
+
+def downgrade():
+    op.drop_index('idx_daily_sales_day_category', table_name='daily_sales')
+    op.drop_table('daily_sales')
@@ -0,0 +1,39 @@
+"""add recipes and inventory depletion tracking
+
+Revision ID: 7e4d09c2b6a1
+Revises: 3c5f1b7e2a90
+Create Date: 2026-10-17 10:41:53.220871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e4d09c2b6a1'
+down_revision = '3c5f1b7e2a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('recipe_ingredient',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('menu_item_id', sa.Integer(), nullable=False),
+    sa.Column('inventory_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['inventory_id'], ['inventory.id'], ),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_item.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('menu_item_id', 'inventory_id', name='uq_recipe_ingredient')
+    )
+    op.create_index('idx_recipe_ingredient_inventory_id', 'recipe_ingredient', ['inventory_id'])
+    with op.batch_alter_table('order') as batch_op:
+        batch_op.add_column(sa.Column('inventory_depleted_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('order') as batch_op:
+        batch_op.drop_column('inventory_depleted_at')
+    op.drop_index('idx_recipe_ingredient_inventory_id', table_name='recipe_ingredient')
+    op.drop_table('recipe_ingredient')
@@ -0,0 +1,72 @@
+"""add lookup and composite indexes
+
+Adds the foreign-key lookup indexes and the composite (status, created_at)
+and reservation slot indexes declared on the models, and drops indexes that
+duplicate UNIQUE constraints. Databases created by db.create_all() and
+stamped at the baseline get the baseline's indexes here too.
+
+Revision ID: 940e9a74839c
+Revises: b201d23f06c7
+Create Date: 2026-10-17 09:15:27.904415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '940e9a74839c'
+down_revision = 'b201d23f06c7'
+branch_labels = None
+depends_on = None
+
+
+# Databases built by the old db.create_all() and stamped at the baseline never had
+# the schema file's indexes, so those are checked for before being dropped or relied on
+def _index_names(table_name):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table_name)}
+
+
+def _drop_index_if_exists(name, table_name):
+    if name in _index_names(table_name):
+        op.drop_index(name, table_name=table_name)
+
+
+def upgrade():
+    for name, table_name, columns in (
+        ('idx_order_created_at', 'order', ['created_at']),
+        ('idx_menu_item_category', 'menu_item', ['category']),
+        ('idx_menu_item_available', 'menu_item', ['available']),
+        ('idx_table_status', 'table', ['status']),
+    ):
+        if name not in _index_names(table_name):
+            op.create_index(name, table_name, columns)
+
+    # (status, created_at) serves status-only lookups too, so it replaces idx_order_status
+    op.create_index('idx_order_status_created_at', 'order', ['status', 'created_at'])
+    _drop_index_if_exists('idx_order_status', 'order')
+    op.create_index('idx_order_table_id', 'order', ['table_id'])
+    op.create_index('idx_order_customer_id', 'order', ['customer_id'])
+    op.create_index('idx_order_item_order_id', 'order_item', ['order_id'])
+    op.create_index('idx_order_item_menu_item_id', 'order_item', ['menu_item_id'])
+    op.create_index('idx_reservation_table_slot', 'reservation', ['table_id', 'reservation_date', 'reservation_time'])
+
+    # These duplicate the indexes behind the UNIQUE constraints and only slow down writes
+    _drop_index_if_exists('idx_user_username', 'user')
+    _drop_index_if_exists('idx_user_email', 'user')
+    _drop_index_if_exists('idx_customer_email', 'customer')
+    _drop_index_if_exists('idx_table_number', 'table')
+
+
+def downgrade():
+    op.create_index('idx_table_number', 'table', ['table_number'])
+    op.create_index('idx_customer_email', 'customer', ['email'])
+    op.create_index('idx_user_email', 'user', ['email'])
+    op.create_index('idx_user_username', 'user', ['username'])
+    op.drop_index('idx_reservation_table_slot', table_name='reservation')
+    op.drop_index('idx_order_item_menu_item_id', table_name='order_item')
+    op.drop_index('idx_order_item_order_id', table_name='order_item')
+    op.drop_index('idx_order_customer_id', table_name='order')
+    op.drop_index('idx_order_table_id', table_name='order')
+    op.create_index('idx_order_status', 'order', ['status'])
+    op.drop_index('idx_order_status_created_at', table_name='order')
@@ -0,0 +1,29 @@
+"""add updated_at to customers
+
+Revision ID: 9b3e7f1c5a62
+Revises: 4d9e61b3f2a8
+Create Date: 2026-10-17 15:41:09.318270
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b3e7f1c5a62'
+down_revision = '4d9e61b3f2a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('customer') as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    customers = sa.table('customer', sa.column('created_at'), sa.column('updated_at'))
+    op.execute(customers.update().values(updated_at=customers.c.created_at))
+
+
+def downgrade():
+    with op.batch_alter_table('customer') as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,34 @@
+"""store money as decimal
+
+Revision ID: b201d23f06c7
+Revises: da71a8651e81
+Create Date: 2026-10-17 09:14:02.551937
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b201d23f06c7'
+down_revision = 'da71a8651e81'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('menu_item') as batch_op:
+        batch_op.alter_column('price', existing_type=sa.Float(), type_=sa.Numeric(10, 2), existing_nullable=False)
+    with op.batch_alter_table('order') as batch_op:
+        batch_op.alter_column('total_amount', existing_type=sa.Float(), type_=sa.Numeric(10, 2), existing_nullable=True)
+    with op.batch_alter_table('order_item') as batch_op:
+        batch_op.alter_column('price', existing_type=sa.Float(), type_=sa.Numeric(10, 2), existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order_item') as batch_op:
+        batch_op.alter_column('price', existing_type=sa.Numeric(10, 2), type_=sa.Float(), existing_nullable=False)
+    with op.batch_alter_table('order') as batch_op:
+        batch_op.alter_column('total_amount', existing_type=sa.Numeric(10, 2), type_=sa.Float(), existing_nullable=True)
+    with op.batch_alter_table('menu_item') as batch_op:
+        batch_op.alter_column('price', existing_type=sa.Numeric(10, 2), type_=sa.Float(), existing_nullable=False)
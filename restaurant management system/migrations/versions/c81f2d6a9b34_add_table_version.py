@@ -0,0 +1,26 @@
+"""add table version for compare-and-set status changes
+
+Revision ID: c81f2d6a9b34
+Revises: 5a8c3e91d4f7
+Create Date: 2026-10-17 12:05:12.408331
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81f2d6a9b34'
+down_revision = '5a8c3e91d4f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('table') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('table') as batch_op:
+        batch_op.drop_column('version')
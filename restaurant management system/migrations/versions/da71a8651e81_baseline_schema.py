@@ -0,0 +1,136 @@
+"""baseline schema
+
+Matches the tables and indexes created by the original database_schema.sql.
+Databases imported from that file can be stamped at this revision with
+``flask db stamp da71a8651e81`` and then upgraded.
+
+Revision ID: da71a8651e81
+Revises: 
+Create Date: 2026-10-17 09:12:40.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'da71a8651e81'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=80), nullable=False),
+    sa.Column('email', sa.String(length=120), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email'),
+    sa.UniqueConstraint('username')
+    )
+    op.create_table('customer',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=120), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('address', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_table('menu_item',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('image_url', sa.String(length=255), nullable=True),
+    sa.Column('available', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('table',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('table_number', sa.Integer(), nullable=False),
+    sa.Column('capacity', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('table_number')
+    )
+    op.create_table('inventory',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('quantity', sa.Float(), nullable=False),
+    sa.Column('unit', sa.String(length=20), nullable=False),
+    sa.Column('reorder_level', sa.Float(), nullable=False),
+    sa.Column('cost_per_unit', sa.Float(), nullable=False),
+    sa.Column('supplier', sa.String(length=100), nullable=True),
+    sa.Column('last_updated', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('order',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('table_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('total_amount', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['customer_id'], ['customer.id'], ),
+    sa.ForeignKeyConstraint(['table_id'], ['table.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('reservation',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('table_id', sa.Integer(), nullable=False),
+    sa.Column('customer_name', sa.String(length=100), nullable=False),
+    sa.Column('customer_email', sa.String(length=120), nullable=True),
+    sa.Column('customer_phone', sa.String(length=20), nullable=False),
+    sa.Column('party_size', sa.Integer(), nullable=False),
+    sa.Column('reservation_date', sa.Date(), nullable=False),
+    sa.Column('reservation_time', sa.Time(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['table_id'], ['table.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('order_item',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('menu_item_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=True),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_item.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['order.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_user_username', 'user', ['username'])
+    op.create_index('idx_user_email', 'user', ['email'])
+    op.create_index('idx_customer_email', 'customer', ['email'])
+    op.create_index('idx_menu_item_category', 'menu_item', ['category'])
+    op.create_index('idx_menu_item_available', 'menu_item', ['available'])
+    op.create_index('idx_table_number', 'table', ['table_number'])
+    op.create_index('idx_table_status', 'table', ['status'])
+    op.create_index('idx_order_status', 'order', ['status'])
+    op.create_index('idx_order_created_at', 'order', ['created_at'])
+
+
+def downgrade():
+    op.drop_table('order_item')
+    op.drop_table('reservation')
+    op.drop_table('order')
+    op.drop_table('inventory')
+    op.drop_table('table')
+    op.drop_table('menu_item')
+    op.drop_table('customer')
+    op.drop_table('user')
@@ -0,0 +1,24 @@
+"""add order updated_at index for the order read API
+
+Revision ID: e2b7a4c90d15
+Revises: c81f2d6a9b34
+Create Date: 2026-10-17 12:48:03.115720
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b7a4c90d15'
+down_revision = 'c81f2d6a9b34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('idx_order_updated_at', 'order', ['updated_at'])
+
+
+def downgrade():
+    op.drop_index('idx_order_updated_at', table_name='order')
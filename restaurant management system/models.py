@@ -1,11 +1,7 @@
 from flask_login import UserMixin
 from datetime import datetime
 
-from extensions import db, login_manager
-
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
+from extensions import db
 
 class Customer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -14,6 +10,7 @@ class Customer(db.Model):
     phone = db.Column(db.String(20))
     address = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     orders = db.relationship('Order', backref='customer', lazy=True)
@@ -36,26 +33,41 @@ class User(db.Model, UserMixin):
         return f'<User {self.username}>'
 
 class MenuItem(db.Model):
+    __table_args__ = (
+        db.Index('idx_menu_item_category', 'category'),
+        db.Index('idx_menu_item_available', 'available'),
+        db.Index('idx_menu_item_updated_at', 'updated_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
-    price = db.Column(db.Float, nullable=False)
+    price = db.Column(db.Numeric(10, 2), nullable=False)
     category = db.Column(db.String(50), nullable=False)  # appetizer, main, dessert, beverage
     image_url = db.Column(db.String(255))
     available = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     order_items = db.relationship('OrderItem', backref='menu_item', lazy=True)
+    recipe = db.relationship('RecipeIngredient', backref='menu_item', lazy=True, cascade='all, delete-orphan')
     
     def __repr__(self):
         return f'<MenuItem {self.name}>'
 
 class Table(db.Model):
+    __table_args__ = (
+        db.Index('idx_table_status', 'status'),
+        db.Index('idx_table_updated_at', 'updated_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     table_number = db.Column(db.Integer, unique=True, nullable=False)
     capacity = db.Column(db.Integer, nullable=False)
     status = db.Column(db.String(20), default='available')  # available, occupied, reserved
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # bumped on every change, see table_state
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     orders = db.relationship('Order', backref='table', lazy=True)
@@ -65,14 +77,24 @@ class Table(db.Model):
         return f'<Table {self.table_number}>'
 
 class Order(db.Model):
+    __table_args__ = (
+        # (status, created_at) also serves plain status lookups via its leftmost column
+        db.Index('idx_order_status_created_at', 'status', 'created_at'),
+        db.Index('idx_order_created_at', 'created_at'),
+        db.Index('idx_order_table_id', 'table_id'),
+        db.Index('idx_order_customer_id', 'customer_id'),
+        db.Index('idx_order_updated_at', 'updated_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     table_id = db.Column(db.Integer, db.ForeignKey('table.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     customer_id = db.Column(db.Integer, db.ForeignKey('customer.id'))
     status = db.Column(db.String(20), default='pending')  # pending, preparing, served, completed, cancelled
-    total_amount = db.Column(db.Float, default=0.0)
+    total_amount = db.Column(db.Numeric(10, 2), default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    inventory_depleted_at = db.Column(db.DateTime)  # Set once ingredients for this order were deducted
     
     # Relationships
     items = db.relationship('OrderItem', backref='order', lazy=True, cascade='all, delete-orphan')
@@ -81,19 +103,31 @@ class Order(db.Model):
         return f'<Order {self.id}>'
 
 class OrderItem(db.Model):
+    __table_args__ = (
+        db.Index('idx_order_item_order_id', 'order_id'),
+        db.Index('idx_order_item_menu_item_id', 'menu_item_id'),
+        db.Index('idx_order_item_updated_at', 'updated_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
     menu_item_id = db.Column(db.Integer, db.ForeignKey('menu_item.id'), nullable=False)
     quantity = db.Column(db.Integer, default=1)
-    price = db.Column(db.Float, nullable=False)  # Price at the time of order
+    price = db.Column(db.Numeric(10, 2), nullable=False)  # Price at the time of order
     status = db.Column(db.String(20), default='pending')  # pending, preparing, ready, served
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def __repr__(self):
         return f'<OrderItem {self.id}>'
 
 class Reservation(db.Model):
+    __table_args__ = (
+        db.Index('idx_reservation_table_slot', 'table_id', 'reservation_date', 'reservation_time'),
+        db.Index('idx_reservation_date', 'reservation_date'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     table_id = db.Column(db.Integer, db.ForeignKey('table.id'), nullable=False)
     customer_name = db.Column(db.String(100), nullable=False)
@@ -120,4 +154,54 @@ class Inventory(db.Model):
     last_updated = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def __repr__(self):
-        return f'<Inventory {self.name}>'
\ No newline at end of file
+        return f'<Inventory {self.name}>'
+
+class RecipeIngredient(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('menu_item_id', 'inventory_id', name='uq_recipe_ingredient'),
+        db.Index('idx_recipe_ingredient_inventory_id', 'inventory_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    menu_item_id = db.Column(db.Integer, db.ForeignKey('menu_item.id'), nullable=False)
+    inventory_id = db.Column(db.Integer, db.ForeignKey('inventory.id'), nullable=False)
+    quantity = db.Column(db.Float, nullable=False)  # Inventory units used per portion
+    
+    # Relationships
+    inventory = db.relationship('Inventory', backref=db.backref('recipe_uses', lazy=True))
+    
+    def __repr__(self):
+        return f'<RecipeIngredient {self.menu_item_id}:{self.inventory_id}>'
+
+class DailySales(db.Model):
+    __tablename__ = 'daily_sales'
+    __table_args__ = (
+        db.UniqueConstraint('day', 'menu_item_id', name='uq_daily_sales_day_item'),
+        db.Index('idx_daily_sales_day_category', 'day', 'category'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    menu_item_id = db.Column(db.Integer, db.ForeignKey('menu_item.id', ondelete='CASCADE'), nullable=False)
+    category = db.Column(db.String(50), nullable=False)  # Copied from the menu item so reports skip the join
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<DailySales {self.day} {self.menu_item_id}>'
+
+# Deleted rows, so /api/sync can tell terminals to drop them
+class SyncTombstone(db.Model):
+    __tablename__ = 'sync_tombstone'
+    __table_args__ = (
+        db.Index('idx_sync_tombstone_deleted_at', 'deleted_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # orders, order_items, tables, menu_items
+    entity_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<SyncTombstone {self.entity} {self.entity_id}>'
@@ -0,0 +1,154 @@
+from datetime import datetime
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import load_only, selectinload
+
+from extensions import db
+from models import Order
+from order_queries import ORDER_STATUSES, decode_cursor, encode_cursor
+
+ORDER_FIELDS = ('id', 'table_id', 'customer_id', 'user_id', 'status', 'total_amount', 'created_at', 'updated_at')
+ITEM_FIELDS = ('id', 'menu_item_id', 'quantity', 'price', 'status', 'notes', 'created_at', 'updated_at')
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_BATCH_IDS = 100
+
+
+class OrderQueryError(ValueError):
+    pass
+
+
+def parse_fields(value):
+    """Requested order fields from ?fields=a,b; id is always returned"""
+    if not value:
+        return list(ORDER_FIELDS)
+    fields = [f.strip() for f in value.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in ORDER_FIELDS]
+    if unknown:
+        raise OrderQueryError(f"Unknown fields: {', '.join(unknown)}")
+    return ['id'] + [f for f in fields if f != 'id']
+
+
+def parse_include(value):
+    include = {i.strip() for i in (value or '').split(',') if i.strip()}
+    if include - {'items'}:
+        raise OrderQueryError('include only supports items')
+    return 'items' in include
+
+
+def parse_ids(value):
+    try:
+        ids = [int(i) for i in value.split(',') if i.strip()]
+    except ValueError:
+        raise OrderQueryError('ids must be a comma-separated list of integers')
+    if len(ids) > MAX_BATCH_IDS:
+        raise OrderQueryError(f'At most {MAX_BATCH_IDS} ids per request')
+    return list(dict.fromkeys(ids))
+
+
+def parse_timestamp(value, name='updated_since'):
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        raise OrderQueryError(f'{name} must be an ISO 8601 timestamp')
+
+
+def json_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is not None and hasattr(value, 'as_tuple'):  # Decimal money
+        return float(value)
+    return value
+
+
+def serialize_order(order, fields, include_items=False):
+    data = {field: json_value(getattr(order, field)) for field in fields}
+    if include_items:
+        data['items'] = [
+            {field: json_value(getattr(item, field)) for field in ITEM_FIELDS}
+            for item in sorted(order.items, key=lambda i: i.id)
+        ]
+    return data
+
+
+def _select_orders(fields, include_items):
+    # Only the requested columns are loaded; items come from one extra IN query
+    stmt = select(Order).options(load_only(*[getattr(Order, f) for f in fields]))
+    if include_items:
+        stmt = stmt.options(selectinload(Order.items))
+    return stmt
+
+
+def get_orders_by_id(ids, fields, include_items=False):
+    """Batch lookup; returns (orders in the requested order, ids that don't exist)"""
+    found = {order.id: order for order in db.session.scalars(
+        _select_orders(fields, include_items).where(Order.id.in_(ids))
+    )}
+    orders = [serialize_order(found[i], fields, include_items) for i in ids if i in found]
+    return orders, [i for i in ids if i not in found]
+
+
+def list_orders(fields, include_items=False, status=None, updated_since=None, cursor=None, per_page=None):
+    """Orders by (updated_at, id) ascending with keyset pagination.
+
+    Pollers pass the updated_at of the last order they saw as updated_since
+    (inclusive, so rows sharing that timestamp are sent again) or follow
+    next_cursor. Returns (orders, next_cursor).
+    """
+    per_page = max(1, min(per_page or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    if status and status not in ORDER_STATUSES:
+        raise OrderQueryError(f"status must be one of {', '.join(ORDER_STATUSES)}")
+
+    load_fields = list(dict.fromkeys(fields + ['updated_at']))
+    stmt = _select_orders(load_fields, include_items)
+    if status:
+        stmt = stmt.where(Order.status == status)
+    if updated_since:
+        stmt = stmt.where(Order.updated_at >= updated_since)
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            raise OrderQueryError('Invalid cursor')
+        updated_at, order_id = position
+        stmt = stmt.where(or_(
+            Order.updated_at > updated_at,
+            and_(Order.updated_at == updated_at, Order.id > order_id)
+        ))
+
+    stmt = stmt.order_by(Order.updated_at, Order.id).limit(per_page + 1)
+    orders = db.session.scalars(stmt).all()
+
+    next_cursor = None
+    if len(orders) > per_page:
+        orders = orders[:per_page]
+        next_cursor = encode_cursor(orders[-1].updated_at, orders[-1].id)
+    return [serialize_order(order, fields, include_items) for order in orders], next_cursor
+
+
+def touch_order(order_id):
+    """Bump an order's updated_at when only its lines changed, so updated_since pollers see it"""
+    db.session.execute(
+        update(Order)
+        .where(Order.id == order_id)
+        .values(updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def set_order_status(order, status, from_statuses=None):
+    """Move an order to `status` with a conditional UPDATE; True only for the request that changed it.
+
+    The row only matches while its status is still one of `from_statuses`
+    (any other status when not given), so of two requests racing to complete
+    or cancel an order exactly one sees rowcount 1 and does the follow-up work.
+    """
+    condition = Order.status.in_(from_statuses) if from_statuses else Order.status != status
+    result = db.session.execute(
+        update(Order)
+        .where(Order.id == order.id, condition)
+        .values(status=status, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    # Make the loaded order reread what the database now holds
+    db.session.expire(order, ['status', 'updated_at'])
+    return result.rowcount == 1
@@ -0,0 +1,145 @@
+from sqlalchemy import insert, select
+
+from extensions import db
+from models import Customer, MenuItem, Order, OrderItem, Table, User
+from order_totals import line_total
+from kitchen_events import queue_event, order_event_data, item_event_data
+from table_state import occupy_tables
+
+MAX_BATCH_SIZE = 200
+
+
+class TicketError(ValueError):
+    pass
+
+
+def _parse_ticket(data):
+    """Validate one POS ticket and normalise its line items"""
+    if not isinstance(data, dict) or 'table_id' not in data or 'items' not in data:
+        raise TicketError('Invalid data')
+    if not isinstance(data['items'], list):
+        raise TicketError('items must be a list')
+
+    lines = []
+    for item_data in data['items']:
+        if not isinstance(item_data, dict) or 'menu_item_id' not in item_data:
+            raise TicketError('Each item needs a menu_item_id')
+        try:
+            menu_item_id = int(item_data['menu_item_id'])
+            quantity = int(item_data.get('quantity', 1))
+        except (TypeError, ValueError):
+            raise TicketError('menu_item_id and quantity must be integers')
+        if quantity < 1:
+            raise TicketError('quantity must be at least 1')
+        lines.append((menu_item_id, quantity, item_data.get('notes', '')))
+
+    try:
+        table_id = int(data['table_id'])
+        user_id = int(data.get('user_id', 1))  # Default to first user if not provided
+        customer_id = int(data['customer_id']) if data.get('customer_id') is not None else None
+    except (TypeError, ValueError):
+        raise TicketError('table_id, user_id and customer_id must be integers')
+
+    return {
+        'table_id': table_id,
+        'user_id': user_id,
+        'customer_id': customer_id,
+        'lines': lines
+    }
+
+
+def _known_ids(model, ids):
+    ids = {i for i in ids if i is not None}
+    return set(db.session.scalars(select(model.id).where(model.id.in_(ids)))) if ids else set()
+
+
+def ingest_tickets(tickets):
+    """Create orders for a list of POS tickets in a single transaction.
+
+    Menu items, tables, users and customers for every ticket are checked with one IN query each,
+    order lines are written with one executemany INSERT, and totals are computed
+    before the orders are flushed so no order is ever committed without them.
+    Returns (created, errors); invalid tickets are reported by index and skipped.
+    The caller owns the commit.
+    """
+    parsed, errors = [], []
+    for index, data in enumerate(tickets):
+        try:
+            parsed.append((index, _parse_ticket(data)))
+        except TicketError as e:
+            errors.append({'index': index, 'error': str(e)})
+
+    menu_item_ids = {line[0] for _, ticket in parsed for line in ticket['lines']}
+    table_ids = {ticket['table_id'] for _, ticket in parsed}
+
+    menu_items = {}
+    if menu_item_ids:
+        menu_items = {m.id: m for m in db.session.scalars(
+            select(MenuItem).where(MenuItem.id.in_(menu_item_ids))
+        )}
+    known_tables = _known_ids(Table, table_ids)
+    # Checked here so one bad id is reported against its ticket instead of failing the commit
+    known_users = _known_ids(User, {ticket['user_id'] for _, ticket in parsed})
+    known_customers = _known_ids(Customer, {ticket['customer_id'] for _, ticket in parsed})
+
+    pending = []
+    for index, ticket in parsed:
+        if ticket['table_id'] not in known_tables:
+            errors.append({'index': index, 'error': 'Unknown table'})
+            continue
+        if ticket['user_id'] not in known_users:
+            errors.append({'index': index, 'error': 'Unknown user'})
+            continue
+        if ticket['customer_id'] is not None and ticket['customer_id'] not in known_customers:
+            errors.append({'index': index, 'error': 'Unknown customer'})
+            continue
+
+        # Unknown menu items are skipped, as the single-ticket endpoint always did
+        lines = [
+            (menu_items[menu_item_id], quantity, notes)
+            for menu_item_id, quantity, notes in ticket['lines']
+            if menu_item_id in menu_items
+        ]
+        order = Order(
+            table_id=ticket['table_id'],
+            user_id=ticket['user_id'],
+            customer_id=ticket['customer_id'],
+            status='pending',
+            total_amount=sum(line_total(menu_item.price, quantity) for menu_item, quantity, _ in lines)
+        )
+        pending.append((index, order, lines))
+
+    if not pending:
+        return [], errors
+
+    db.session.add_all([order for _, order, _ in pending])
+    db.session.flush()
+
+    rows = [{
+        'order_id': order.id,
+        'menu_item_id': menu_item.id,
+        'quantity': quantity,
+        'price': menu_item.price,
+        'notes': notes
+    } for _, order, lines in pending for menu_item, quantity, notes in lines]
+    if rows:
+        db.session.execute(insert(OrderItem), rows)
+
+    # One read-back of the new lines so kitchen screens get their ids
+    order_ids = [order.id for _, order, _ in pending]
+    new_items = db.session.scalars(select(OrderItem).where(OrderItem.order_id.in_(order_ids))).all() if rows else []
+    for _, order, _ in pending:
+        queue_event('order.created', order_event_data(order))
+    for item in new_items:
+        menu_item = menu_items[item.menu_item_id]
+        queue_event('item.added', item_event_data(item, menu_item.name, menu_item.category))
+
+    occupy_tables(order.table_id for _, order, _ in pending)
+
+    created = [{
+        'index': index,
+        'order_id': order.id,
+        'total_amount': float(order.total_amount),
+        'status': order.status
+    } for index, order, _ in pending]
+    return created, sorted(errors, key=lambda e: e['index'])
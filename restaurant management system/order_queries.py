@@ -0,0 +1,94 @@
+import base64
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import joinedload
+
+from extensions import db
+from models import Order, OrderItem
+
+ORDER_STATUSES = ['pending', 'preparing', 'served', 'completed', 'cancelled']
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+
+class OrderPage:
+    """One page of the order listing plus the cursor for the next page"""
+
+    def __init__(self, rows, next_cursor):
+        self.rows = rows  # list of (Order, item_count) tuples
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(created_at, order_id):
+    raw = f'{created_at.isoformat()}|{order_id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Return (created_at, id) for a cursor string, or None if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, order_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), int(order_id)
+    except (ValueError, UnicodeError):
+        return None
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+    except ValueError:
+        return None
+
+
+def paginate_orders(status=None, date_from=None, date_to=None, cursor=None, per_page=DEFAULT_PAGE_SIZE):
+    """Newest-first keyset pagination over orders.
+
+    Customer and table are joined into the same statement and the item count
+    is a correlated subquery, counted through idx_order_item_order_id for just
+    the orders on the page, so a page costs one query regardless of size.
+    """
+    per_page = max(1, min(per_page or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+    item_count = (
+        select(func.count(OrderItem.id))
+        .where(OrderItem.order_id == Order.id)
+        .correlate(Order)
+        .scalar_subquery()
+    )
+    stmt = (
+        select(Order, item_count)
+        .options(joinedload(Order.customer), joinedload(Order.table))
+    )
+
+    if status:
+        stmt = stmt.where(Order.status == status)
+    # Half-open range so the created_at index can be used directly
+    if date_from:
+        stmt = stmt.where(Order.created_at >= datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        stmt = stmt.where(Order.created_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        created_at, order_id = position
+        stmt = stmt.where(or_(
+            Order.created_at < created_at,
+            and_(Order.created_at == created_at, Order.id < order_id)
+        ))
+
+    stmt = stmt.order_by(Order.created_at.desc(), Order.id.desc()).limit(per_page + 1)
+    rows = [(order, count) for order, count in db.session.execute(stmt).all()]
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1][0]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return OrderPage(rows, next_cursor)
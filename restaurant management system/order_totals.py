@@ -0,0 +1,46 @@
+from sqlalchemy import func, select, update
+
+from extensions import db
+from models import Order, OrderItem
+
+
+def line_total(price, quantity):
+    return price * quantity
+
+
+def adjust_order_total(order_id, delta):
+    """Atomically add delta to an order's total inside the current transaction.
+
+    The increment is evaluated by the database against the locked row, so two
+    terminals changing the same order never overwrite each other's update.
+    """
+    db.session.execute(
+        update(Order)
+        .where(Order.id == order_id)
+        .values(total_amount=Order.total_amount + delta)
+        .execution_options(synchronize_session=False)
+    )
+    _expire_total(order_id)
+
+
+def recalculate_order_total(order_id):
+    """Reset an order's total to the sum of its lines, repairing any drift"""
+    lines_total = (
+        select(func.coalesce(func.sum(OrderItem.price * OrderItem.quantity), 0))
+        .where(OrderItem.order_id == order_id)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        update(Order)
+        .where(Order.id == order_id)
+        .values(total_amount=lines_total)
+        .execution_options(synchronize_session=False)
+    )
+    _expire_total(order_id)
+
+
+def _expire_total(order_id):
+    # Make any loaded Order reread its total instead of showing the pre-update value
+    order = db.session.identity_map.get(db.session.identity_key(Order, order_id))
+    if order is not None:
+        db.session.expire(order, ['total_amount'])
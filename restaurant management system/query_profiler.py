@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import defaultdict, deque
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+SLOWEST_PER_REQUEST = 3
+STATEMENT_PREVIEW = 200
+
+
+class QueryStats:
+    """Rolling per-endpoint aggregate of query counts and database time"""
+
+    def __init__(self, window=500):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._slowest = defaultdict(list)
+
+    def record(self, endpoint, query_count, db_seconds, slowest):
+        with self._lock:
+            self._samples[endpoint].append((query_count, db_seconds))
+            merged = sorted(self._slowest[endpoint] + slowest, key=lambda q: q[0], reverse=True)
+            self._slowest[endpoint] = merged[:SLOWEST_PER_REQUEST]
+
+    def report(self):
+        with self._lock:
+            report = {}
+            for endpoint, samples in self._samples.items():
+                counts = [s[0] for s in samples]
+                times = [s[1] for s in samples]
+                report[endpoint] = {
+                    'requests': len(samples),
+                    'queries_avg': round(sum(counts) / len(counts), 2),
+                    'queries_max': max(counts),
+                    'db_ms_avg': round(sum(times) / len(times) * 1000, 2),
+                    'db_ms_max': round(max(times) * 1000, 2),
+                    'slowest': [
+                        {'ms': round(seconds * 1000, 2), 'statement': statement}
+                        for seconds, statement in self._slowest[endpoint]
+                    ],
+                }
+            return report
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._slowest.clear()
+
+
+stats = QueryStats()
+
+
+def init_query_profiler(app, engine):
+    """Count and time every SQL statement issued while handling a request.
+
+    Each response carries a Server-Timing header with the query count and
+    total DB time; statements slower than SLOW_QUERY_MS are logged.
+    """
+    slow_query_seconds = app.config.get('SLOW_QUERY_MS', 100) / 1000.0
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+        if not has_request_context() or 'query_profile' not in g:
+            return
+        profile = g.query_profile
+        profile['count'] += 1
+        profile['seconds'] += elapsed
+        profile['statements'].append((elapsed, statement[:STATEMENT_PREVIEW]))
+        if elapsed >= slow_query_seconds:
+            app.logger.warning('Slow query (%.1f ms) on %s: %s', elapsed * 1000, request.endpoint, statement[:STATEMENT_PREVIEW])
+
+    @app.before_request
+    def start_query_profile():
+        g.query_profile = {'count': 0, 'seconds': 0.0, 'statements': []}
+
+    @app.after_request
+    def finish_query_profile(response):
+        profile = g.pop('query_profile', None)
+        if profile is None:
+            return response
+        slowest = sorted(profile['statements'], key=lambda q: q[0], reverse=True)[:SLOWEST_PER_REQUEST]
+        stats.record(request.endpoint or 'unknown', profile['count'], profile['seconds'], slowest)
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={profile["seconds"] * 1000:.2f};desc="{profile["count"]} queries"'
+        )
+        return response
@@ -0,0 +1,188 @@
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import current_app
+
+from extensions import db
+from models import Reservation, Table
+
+ACTIVE_RESERVATION_STATUSES = ('confirmed', 'seated')
+
+_lock = threading.Lock()
+_days = OrderedDict()  # date -> DayIndex, least recently used first
+_versions = OrderedDict()  # date -> int, bumped whenever a reservation on that day changes
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def seating_minutes(party_size):
+    """How long a party of this size holds its table, from RESERVATION_SEATING_MINUTES"""
+    for max_party, minutes in current_app.config['RESERVATION_SEATING_MINUTES']:
+        if max_party is None or party_size <= max_party:
+            return minutes
+    return current_app.config['RESERVATION_SEATING_MINUTES'][-1][1]
+
+
+class TableIntervals:
+    """Booked intervals for one table, sorted by start minute"""
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.ids = []
+        self.longest = 0
+
+    def add(self, start, end, reservation_id):
+        i = bisect.bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.ids.insert(i, reservation_id)
+        self.longest = max(self.longest, end - start)
+
+    def conflicts(self, start, end, ignore_id=None):
+        """Reservation ids overlapping [start, end).
+
+        Only bookings starting within the longest seating before `end` can
+        overlap, so the scan is a binary search plus a handful of neighbours.
+        """
+        lo = bisect.bisect_right(self.starts, start - self.longest)
+        hi = bisect.bisect_left(self.starts, end)
+        return [
+            self.ids[i] for i in range(lo, hi)
+            if self.ends[i] > start and self.ids[i] != ignore_id
+        ]
+
+
+class DayIndex:
+    """All tables and active reservations for one day, indexed for availability queries"""
+
+    def __init__(self, day, version, tables, reservations):
+        self.day = day
+        self.version = version
+        self.built_at = time.monotonic()
+        # Smallest tables first so searches return the tightest fit
+        self.tables = sorted(tables, key=lambda t: (t['capacity'], t['table_number']))
+        self.capacities = [t['capacity'] for t in self.tables]
+        self.intervals = {t['id']: TableIntervals() for t in tables}
+        for reservation_id, table_id, start, party_size in reservations:
+            if table_id in self.intervals:
+                self.intervals[table_id].add(start, start + seating_minutes(party_size), reservation_id)
+
+    def available_tables(self, party_size, at, duration=None, ignore_id=None):
+        start = to_minutes(at)
+        end = start + (duration or seating_minutes(party_size))
+        first = bisect.bisect_left(self.capacities, party_size)
+        return [
+            t for t in self.tables[first:]
+            if not self.intervals[t['id']].conflicts(start, end, ignore_id)
+        ]
+
+
+def _build_day(day, version):
+    tables = [{
+        'id': t.id,
+        'table_number': t.table_number,
+        'capacity': t.capacity
+    } for t in Table.query.all()]
+    reservations = db.session.query(
+        Reservation.id, Reservation.table_id, Reservation.reservation_time, Reservation.party_size
+    ).filter(
+        Reservation.reservation_date == day,
+        Reservation.status.in_(ACTIVE_RESERVATION_STATUSES)
+    ).all()
+    return DayIndex(day, version, tables, [
+        (r.id, r.table_id, to_minutes(r.reservation_time), r.party_size) for r in reservations
+    ])
+
+
+def get_day_index(day):
+    """Return the in-memory index for a day, rebuilding it after changes or when it ages out.
+
+    Bookings made by other worker processes are picked up within
+    RESERVATION_INDEX_TTL seconds; has_conflict() re-checks against the
+    database before saving, so a stale index can never produce a double booking.
+    """
+    ttl = current_app.config.get('RESERVATION_INDEX_TTL', 0)
+    with _lock:
+        index = _days.get(day)
+        version = _versions.get(day, 0)
+        if index:
+            _days.move_to_end(day)
+    if index and index.version == version and time.monotonic() - index.built_at < ttl:
+        return index
+
+    index = _build_day(day, version)
+    with _lock:
+        _days[day] = index
+        _days.move_to_end(day)
+        _trim(current_app.config.get('RESERVATION_INDEX_DAYS', 60))
+    return index
+
+
+def _trim(max_days):
+    # Callers hold _lock. A day's index goes with its version: an index left behind
+    # would match the version reset to 0 and be served stale until its TTL runs out.
+    while len(_days) > max_days:
+        day, _ = _days.popitem(last=False)
+        _versions.pop(day, None)
+    while len(_versions) > max_days:
+        day, _ = _versions.popitem(last=False)
+        _days.pop(day, None)
+
+
+def invalidate_day(day):
+    with _lock:
+        _versions[day] = _versions.get(day, 0) + 1
+        _versions.move_to_end(day)
+        _trim(current_app.config.get('RESERVATION_INDEX_DAYS', 60))
+
+
+def invalidate_all():
+    """Drop every cached day, e.g. after tables are added or resized"""
+    with _lock:
+        for day in list(_days):
+            _versions[day] = _versions.get(day, 0) + 1
+
+
+def find_available_tables(day, at, party_size, ignore_id=None):
+    return get_day_index(day).available_tables(party_size, at, ignore_id=ignore_id)
+
+
+def has_conflict(table_id, day, at, party_size, ignore_id=None):
+    """Authoritative check against the database for one table, with the table row locked.
+
+    Locking the table row serialises concurrent bookings for the same table
+    only; it uses idx_reservation_table_slot to read that table's day. The
+    reservations are read with FOR UPDATE too: under REPEATABLE READ a plain
+    read would come from the snapshot taken by the request's first query, and
+    miss a booking committed while this one waited for the lock.
+    """
+    db.session.query(Table.id).filter(Table.id == table_id).with_for_update().first()
+    start = to_minutes(at)
+    end = start + seating_minutes(party_size)
+    rows = db.session.query(
+        Reservation.id, Reservation.reservation_time, Reservation.party_size
+    ).filter(
+        Reservation.table_id == table_id,
+        Reservation.reservation_date == day,
+        Reservation.status.in_(ACTIVE_RESERVATION_STATUSES)
+    ).with_for_update().all()
+    for row in rows:
+        if row.id == ignore_id:
+            continue
+        other_start = to_minutes(row.reservation_time)
+        if other_start < end and start < other_start + seating_minutes(row.party_size):
+            return True
+    return False
+
+
+def parse_time(value):
+    try:
+        return datetime.strptime(value, '%H:%M').time() if value else None
+    except ValueError:
+        return None
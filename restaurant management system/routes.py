@@ -1,9 +1,28 @@
-from flask import render_template, redirect, url_for, flash, request, jsonify
+from flask import render_template, redirect, url_for, flash, request, jsonify, Response, stream_with_context
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
-from models import User, MenuItem, Table, Order, OrderItem, Reservation, Inventory, Customer
+from auth_limits import HashingBusy, get_hasher, login_retry_after
+from models import User, MenuItem, Table, Order, OrderItem, Reservation, Inventory, Customer, RecipeIngredient
 from forms import LoginForm, RegistrationForm, MenuItemForm, TableForm, ReservationForm, OrderForm, OrderItemForm, InventoryForm, CustomerForm
-from datetime import datetime
+from order_queries import ORDER_STATUSES, paginate_orders, parse_date
+from dashboard_stats import get_dashboard_stats, invalidate_dashboard_stats
+from order_ingest import MAX_BATCH_SIZE, ingest_tickets
+import order_api
+import delta_sync
+from menu_cache import get_catalog, bump_menu_version
+from order_totals import line_total, adjust_order_total, recalculate_order_total
+from db_pool import pool_stats, format_prometheus
+import reservations as reservation_index
+from inventory_depletion import deplete_orders
+from exports import EXPORT_FORMATS, export_chunks, export_filename
+from sales_rollup import REPORT_GROUPS, record_completed_order, remove_completed_order, sales_report
+from customer_search import search_customers, index_customer, unindex_customer
+import table_state
+import query_profiler
+from kitchen_events import ITEM_STATUSES, queue_event, order_event_data, item_event_data, stream as kitchen_stream
+import kitchen_scheduler
+import bulk_import
+from sqlalchemy.orm import joinedload
+from datetime import date, datetime, timedelta
 
 from extensions import db, login_manager
 
@@ -21,8 +40,19 @@ def register_routes(app):
         
         form = LoginForm()
         if form.validate_on_submit():
+            # Throttle guessing per client and per account before spending a password hash on it
+            retry_after = login_retry_after(request.remote_addr, form.username.data)
+            if retry_after:
+                flash('Too many login attempts. Please wait a moment and try again.', 'danger')
+                return render_template('auth/login.html', form=form), 429, {'Retry-After': str(int(retry_after) + 1)}
+            
             user = User.query.filter_by(username=form.username.data).first()
-            if user and check_password_hash(user.password_hash, form.password.data):
+            try:
+                valid = user is not None and get_hasher().check(user.password_hash, form.password.data)
+            except HashingBusy:
+                flash('The server is busy. Please try again in a moment.', 'warning')
+                return render_template('auth/login.html', form=form), 503, {'Retry-After': '1'}
+            if valid:
                 login_user(user, remember=form.remember.data)
                 next_page = request.args.get('next')
                 return redirect(next_page or url_for('dashboard'))
@@ -44,7 +74,11 @@ def register_routes(app):
         
         form = RegistrationForm()
         if form.validate_on_submit():
-            hashed_password = generate_password_hash(form.password.data)
+            try:
+                hashed_password = get_hasher().generate(form.password.data)
+            except HashingBusy:
+                flash('The server is busy. Please try again in a moment.', 'warning')
+                return render_template('auth/register.html', form=form), 503, {'Retry-After': '1'}
             user = User(username=form.username.data, email=form.email.data, password_hash=hashed_password)
             db.session.add(user)
             db.session.commit()
@@ -57,74 +91,12 @@ def register_routes(app):
     @app.route('/dashboard')
     @login_required
     def dashboard():
-        from datetime import date, timedelta
-        from sqlalchemy import func
-        
-        # Get basic counts
-        total_orders = Order.query.count()
-        active_orders = Order.query.filter(Order.status.in_(['pending', 'preparing'])).count()
-        total_customers = Customer.query.count()
-        total_tables = Table.query.count()
-        available_tables = Table.query.filter_by(status='available').count()
-        occupied_tables = Table.query.filter_by(status='occupied').count()
-        
-        # Calculate today's revenue
-        today = date.today()
-        today_revenue = db.session.query(func.sum(Order.total_amount)).filter(
-            func.date(Order.created_at) == today,
-            Order.status == 'completed'
-        ).scalar() or 0
-        
-        # Calculate yesterday's revenue for comparison
-        yesterday = today - timedelta(days=1)
-        yesterday_revenue = db.session.query(func.sum(Order.total_amount)).filter(
-            func.date(Order.created_at) == yesterday,
-            Order.status == 'completed'
-        ).scalar() or 0
-        
-        # Calculate revenue change percentage
-        if yesterday_revenue > 0:
-            revenue_change = round(((today_revenue - yesterday_revenue) / yesterday_revenue) * 100, 1)
-        else:
-            revenue_change = 0
-        
-        # Get new customers this week
-        week_ago = today - timedelta(days=7)
-        new_customers = Customer.query.filter(func.date(Customer.created_at) >= week_ago).count()
-        
-        # Create stats object
-        stats = {
-            'total_orders': total_orders,
-            'active_orders': active_orders,
-            'today_revenue': f"{today_revenue:.2f}",
-            'revenue_change': revenue_change,
-            'total_customers': total_customers,
-            'new_customers': new_customers,
-            'total_tables': total_tables,
-            'available_tables': available_tables,
-            'occupied_tables': occupied_tables
-        }
+        stats, popular_items = get_dashboard_stats()
         
         # Get recent orders (last 10)
-        recent_orders = Order.query.order_by(Order.created_at.desc()).limit(10).all()
-        
-        # Get popular menu items (based on order frequency)
-        popular_items_query = db.session.query(
-            MenuItem.id,
-            MenuItem.name,
-            MenuItem.category,
-            MenuItem.price,
-            func.count(OrderItem.id).label('order_count')
-        ).join(OrderItem).group_by(MenuItem.id).order_by(func.count(OrderItem.id).desc()).limit(5).all()
-        
-        popular_items = []
-        for item in popular_items_query:
-            popular_items.append({
-                'name': item.name,
-                'category': item.category,
-                'price': item.price,
-                'order_count': item.order_count
-            })
+        recent_orders = Order.query.options(
+            joinedload(Order.customer), joinedload(Order.table)
+        ).order_by(Order.created_at.desc()).limit(10).all()
         
         return render_template('dashboard.html', 
                               stats=stats,
@@ -151,6 +123,7 @@ def register_routes(app):
             )
             db.session.add(customer)
             db.session.commit()
+            index_customer(customer)
             flash('Customer added successfully!', 'success')
             return redirect(url_for('customer_list'))
         
@@ -169,6 +142,7 @@ def register_routes(app):
             customer.address = form.address.data
             
             db.session.commit()
+            index_customer(customer)
             flash('Customer updated successfully!', 'success')
             return redirect(url_for('customer_list'))
         
@@ -180,6 +154,7 @@ def register_routes(app):
         customer = Customer.query.get_or_404(id)
         db.session.delete(customer)
         db.session.commit()
+        unindex_customer(id)
         flash('Customer deleted successfully!', 'success')
         return redirect(url_for('customer_list'))
     
@@ -187,7 +162,7 @@ def register_routes(app):
     @app.route('/menu')
     @login_required
     def menu_list():
-        menu_items = MenuItem.query.all()
+        menu_items = get_catalog().items
         return render_template('menu/list.html', menu_items=menu_items)
     
     @app.route('/menu/add', methods=['GET', 'POST'])
@@ -205,6 +180,7 @@ def register_routes(app):
             )
             db.session.add(menu_item)
             db.session.commit()
+            bump_menu_version()
             flash('Menu item added successfully!', 'success')
             return redirect(url_for('menu_list'))
         
@@ -225,6 +201,7 @@ def register_routes(app):
             menu_item.available = form.available.data
             
             db.session.commit()
+            bump_menu_version()
             flash('Menu item updated successfully!', 'success')
             return redirect(url_for('menu_list'))
         
@@ -236,6 +213,7 @@ def register_routes(app):
         menu_item = MenuItem.query.get_or_404(id)
         db.session.delete(menu_item)
         db.session.commit()
+        bump_menu_version()
         flash('Menu item deleted successfully!', 'success')
         return redirect(url_for('menu_list'))
     
@@ -257,7 +235,9 @@ def register_routes(app):
                 status=form.status.data
             )
             db.session.add(table)
+            table_state.table_added()
             db.session.commit()
+            reservation_index.invalidate_all()
             flash('Table added successfully!', 'success')
             return redirect(url_for('table_list'))
         
@@ -268,31 +248,151 @@ def register_routes(app):
     def table_edit(id):
         table = Table.query.get_or_404(id)
         form = TableForm(obj=table)
+        form.id = table.id
         
         if form.validate_on_submit():
-            table.table_number = form.table_number.data
-            table.capacity = form.capacity.data
-            table.status = form.status.data
+            if form.status.data != table.status and form.status.data not in table_state.TRANSITIONS[table.status]:
+                form.status.errors.append(f'A {table.status} table cannot be marked {form.status.data}.')
+                return render_template('tables/form.html', form=form, table=table)
+            
+            # Only saves if nobody changed the table since this form was loaded
+            saved = table_state.update_table(
+                table.id, form.version.data,
+                table_number=form.table_number.data,
+                capacity=form.capacity.data,
+                status=form.status.data
+            )
+            if not saved:
+                db.session.rollback()
+                flash('This table was changed by someone else. Review its current details and save again.', 'warning')
+                return redirect(url_for('table_edit', id=id))
             
             db.session.commit()
+            reservation_index.invalidate_all()
             flash('Table updated successfully!', 'success')
             return redirect(url_for('table_list'))
         
         return render_template('tables/form.html', form=form, table=table)
     
+    # Reservation routes
+    @app.route('/reservations')
+    @login_required
+    def reservation_list():
+        day = parse_date(request.args.get('date')) or date.today()
+        reservations = Reservation.query.options(joinedload(Reservation.table)).filter(
+            Reservation.reservation_date == day
+        ).order_by(Reservation.reservation_time).all()
+        return render_template('reservations/list.html', reservations=reservations, day=day)
+    
+    def _reservation_form(reservation=None):
+        form = ReservationForm(obj=reservation)
+        tables = Table.query.order_by(Table.table_number).all()
+        form.table_id.choices = [(t.id, f'Table {t.table_number} (seats {t.capacity})') for t in tables]
+        form.table_capacities = {t.id: t.capacity for t in tables}
+        return form
+    
+    def _save_reservation(form, reservation=None):
+        """Validate the slot against the database and save; returns False on a double booking"""
+        ignore_id = reservation.id if reservation else None
+        if form.status.data in reservation_index.ACTIVE_RESERVATION_STATUSES and reservation_index.has_conflict(
+            form.table_id.data, form.reservation_date.data, form.reservation_time.data,
+            form.party_size.data, ignore_id=ignore_id
+        ):
+            db.session.rollback()
+            return False
+        
+        old_day = reservation.reservation_date if reservation else None
+        if reservation is None:
+            reservation = Reservation()
+            db.session.add(reservation)
+        reservation.table_id = form.table_id.data
+        reservation.customer_name = form.customer_name.data
+        reservation.customer_email = form.customer_email.data
+        reservation.customer_phone = form.customer_phone.data
+        reservation.party_size = form.party_size.data
+        reservation.reservation_date = form.reservation_date.data
+        reservation.reservation_time = form.reservation_time.data
+        reservation.status = form.status.data
+        reservation.notes = form.notes.data
+        db.session.commit()
+        
+        reservation_index.invalidate_day(reservation.reservation_date)
+        if old_day and old_day != reservation.reservation_date:
+            reservation_index.invalidate_day(old_day)
+        return True
+    
+    def _conflict_message(form, ignore_id=None):
+        alternatives = reservation_index.find_available_tables(
+            form.reservation_date.data, form.reservation_time.data, form.party_size.data, ignore_id=ignore_id
+        )
+        if alternatives:
+            numbers = ', '.join(str(t['table_number']) for t in alternatives[:5])
+            return f'That table is already booked at this time. Available tables: {numbers}.'
+        return 'That table is already booked at this time and no other table fits this party.'
+    
+    @app.route('/reservations/add', methods=['GET', 'POST'])
+    @login_required
+    def reservation_add():
+        form = _reservation_form()
+        if form.validate_on_submit():
+            if _save_reservation(form):
+                flash('Reservation added successfully!', 'success')
+                return redirect(url_for('reservation_list', date=form.reservation_date.data.isoformat()))
+            flash(_conflict_message(form), 'danger')
+        
+        return render_template('reservations/form.html', form=form)
+    
+    @app.route('/reservations/edit/<int:id>', methods=['GET', 'POST'])
+    @login_required
+    def reservation_edit(id):
+        reservation = Reservation.query.get_or_404(id)
+        form = _reservation_form(reservation)
+        
+        if form.validate_on_submit():
+            if _save_reservation(form, reservation):
+                flash('Reservation updated successfully!', 'success')
+                return redirect(url_for('reservation_list', date=reservation.reservation_date.isoformat()))
+            flash(_conflict_message(form, ignore_id=id), 'danger')
+        
+        return render_template('reservations/form.html', form=form, reservation=reservation)
+    
+    @app.route('/reservations/<int:id>/cancel', methods=['POST'])
+    @login_required
+    def reservation_cancel(id):
+        reservation = Reservation.query.get_or_404(id)
+        reservation.status = 'cancelled'
+        db.session.commit()
+        reservation_index.invalidate_day(reservation.reservation_date)
+        flash('Reservation cancelled!', 'success')
+        return redirect(url_for('reservation_list', date=reservation.reservation_date.isoformat()))
+    
     # Order routes
     @app.route('/orders')
     @login_required
     def order_list():
-        orders = Order.query.all()
-        return render_template('orders/list.html', orders=orders)
+        filters = {
+            'status': request.args.get('status') if request.args.get('status') in ORDER_STATUSES else None,
+            'date_from': parse_date(request.args.get('date_from')),
+            'date_to': parse_date(request.args.get('date_to')),
+        }
+        page = paginate_orders(
+            cursor=request.args.get('cursor'),
+            per_page=request.args.get('per_page', type=int),
+            **filters
+        )
+        return render_template('orders/list.html', page=page, filters=filters, statuses=ORDER_STATUSES)
     
     @app.route('/orders/add', methods=['GET', 'POST'])
     @login_required
     def order_add():
         form = OrderForm()
-        form.table_id.choices = [(t.id, f'Table {t.table_number}') for t in Table.query.filter_by(status='available').all()]
-        form.customer_id.choices = [(c.id, c.name) for c in Customer.query.all()]
+        form.table_id.choices = [(t['id'], f"Table {t['table_number']}") for t in table_state.get_floor_map().available]
+        # Customers are searched from the page as the user types; only the submitted one is loaded here
+        form.customer_id.choices = []
+        if request.method == 'POST':
+            customer = db.session.get(Customer, request.form.get('customer_id', type=int) or 0)
+            if customer:
+                form.customer_id.choices = [(customer.id, customer.name)]
         
         if form.validate_on_submit():
             order = Order(
@@ -301,12 +401,15 @@ def register_routes(app):
                 customer_id=form.customer_id.data,
                 status='pending'
             )
-            db.session.add(order)
-            
-            # Update table status
-            table = Table.query.get(form.table_id.data)
-            table.status = 'occupied'
+            # Seat the table only if it is still free; another host may have just taken it
+            if not table_state.seat_table(form.table_id.data):
+                db.session.rollback()
+                flash('That table was just taken. Please choose another one.', 'warning')
+                return redirect(url_for('order_add'))
             
+            db.session.add(order)
+            db.session.flush()
+            queue_event('order.created', order_event_data(order))
             db.session.commit()
             
             flash('Order created! Now add items to the order.', 'success')
@@ -318,13 +421,15 @@ def register_routes(app):
     @login_required
     def order_items(order_id):
         order = Order.query.get_or_404(order_id)
-        menu_items = MenuItem.query.filter_by(available=True).all()
+        catalog = get_catalog()
+        menu_items = catalog.available_items
         form = OrderItemForm()
-        form.menu_item_id.choices = [(m.id, f'{m.name} (${m.price:.2f})') for m in menu_items]
+        form.menu_item_id.choices = catalog.order_choices
         
         if form.validate_on_submit():
-            menu_item = MenuItem.query.get(form.menu_item_id.data)
-            if menu_item:
+            # Price and availability come from the database: this worker's catalog may be stale
+            menu_item = db.session.get(MenuItem, form.menu_item_id.data)
+            if menu_item and menu_item.available:
                 order_item = OrderItem(
                     order_id=order.id,
                     menu_item_id=menu_item.id,
@@ -334,11 +439,14 @@ def register_routes(app):
                 )
                 db.session.add(order_item)
                 
-                # Update order total
-                order.total_amount += (menu_item.price * form.quantity.data)
+                # Update order total in the database, not from the value read above
+                adjust_order_total(order.id, line_total(menu_item.price, form.quantity.data))
                 
+                queue_event('item.added', item_event_data(order_item, menu_item.name, menu_item.category))
                 db.session.commit()
                 flash('Item added to order!', 'success')
+            else:
+                flash('That menu item is no longer available.', 'warning')
             
             return redirect(url_for('order_items', order_id=order.id))
         
@@ -347,12 +455,12 @@ def register_routes(app):
     @app.route('/orders/<int:order_id>/items/<int:item_id>/delete', methods=['POST'])
     @login_required
     def order_item_delete(order_id, item_id):
-        order_item = OrderItem.query.get_or_404(item_id)
-        order = Order.query.get_or_404(order_id)
+        order_item = OrderItem.query.filter_by(id=item_id, order_id=order_id).first_or_404()
         
-        # Update order total
-        order.total_amount -= (order_item.price * order_item.quantity)
+        # Update order total in the database, not from a value read earlier
+        adjust_order_total(order_id, -line_total(order_item.price, order_item.quantity))
         
+        queue_event('item.removed', {'id': order_item.id, 'order_id': order_id})
         db.session.delete(order_item)
         db.session.commit()
         
@@ -363,68 +471,372 @@ def register_routes(app):
     @login_required
     def order_complete(order_id):
         order = Order.query.get_or_404(order_id)
-        order.status = 'completed'
+        table_state.lock_table(order.table_id)
+        # Decided by the UPDATE itself, not the status read above, so a double submit counts once
+        newly_completed = order_api.set_order_status(order, 'completed')
         
-        # Update table status
-        table = Table.query.get(order.table_id)
-        table.status = 'available'
+        # Settle the total from the order lines before it counts towards revenue
+        recalculate_order_total(order.id)
         
+        # Fold the order into the daily sales rollup once
+        if newly_completed:
+            record_completed_order(order)
+        
+        low_stock = []
+        if app.config['INVENTORY_DEPLETION'] == 'immediate':
+            low_stock = deplete_orders([order.id]).low_stock
+        
+        # Free the table unless it still has another open order
+        table_state.release_table(order.table_id)
+        
+        queue_event('order.status', order_event_data(order))
         db.session.commit()
+        invalidate_dashboard_stats()
         flash('Order completed!', 'success')
+        for item in low_stock:
+            flash(f"{item['name']} is below its reorder level ({item['quantity']:g} {item['unit']} left).", 'warning')
         return redirect(url_for('order_list'))
     
     @app.route('/orders/<int:order_id>/cancel', methods=['POST'])
     @login_required
     def order_cancel(order_id):
         order = Order.query.get_or_404(order_id)
-        order.status = 'cancelled'
+        table_state.lock_table(order.table_id)
+        # A completed order already counts towards sales; take it back out of the rollup
+        if order_api.set_order_status(order, 'cancelled', from_statuses=('completed',)):
+            remove_completed_order(order)
+        else:
+            order_api.set_order_status(order, 'cancelled')
         
-        # Update table status
-        table = Table.query.get(order.table_id)
-        table.status = 'available'
+        # Free the table unless it still has another open order
+        table_state.release_table(order.table_id)
         
+        queue_event('order.status', order_event_data(order))
         db.session.commit()
+        invalidate_dashboard_stats()
         flash('Order cancelled!', 'success')
         return redirect(url_for('order_list'))
     
+    # Export routes for accounting
+    @app.route('/exports/orders')
+    @login_required
+    def export_orders():
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': f'format must be one of {", ".join(EXPORT_FORMATS)}'}), 400
+        compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+        date_from = parse_date(request.args.get('date_from'))
+        date_to = parse_date(request.args.get('date_to'))
+        
+        mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+        response = Response(
+            stream_with_context(export_chunks(export_format, compress, date_from, date_to)),
+            mimetype='application/gzip' if compress else mimetype
+        )
+        response.headers['Content-Disposition'] = (
+            f'attachment; filename="{export_filename(export_format, compress, date_from, date_to)}"'
+        )
+        return response
+    
+    # Bulk import: multipart upload with a "file" field
+    @app.route('/imports/<kind>', methods=['POST'])
+    @login_required
+    def import_upload(kind):
+        if kind not in bulk_import.IMPORT_KINDS:
+            return jsonify({'error': f'kind must be one of {", ".join(bulk_import.IMPORT_KINDS)}'}), 404
+        upload = request.files.get('file')
+        if upload is None:
+            return jsonify({'error': 'Upload the file in a "file" form field'}), 400
+        import_format = request.args.get('format') or bulk_import.detect_format(upload.filename)
+        if import_format not in bulk_import.IMPORT_FORMATS:
+            return jsonify({'error': f'format must be one of {", ".join(bulk_import.IMPORT_FORMATS)}'}), 400
+        dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        
+        try:
+            result = bulk_import.import_records(kind, bulk_import.iter_records(upload.stream, import_format), dry_run=dry_run)
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': f'Could not read the file: {e}'}), 400
+        return jsonify({**result.to_dict(max_errors=bulk_import.MAX_REPORTED_ERRORS), 'dry_run': dry_run})
+    
+    # Monitoring routes
+    @app.route('/metrics')
+    def metrics():
+        stats = pool_stats(db.engine.pool)
+        if request.args.get('format') == 'json':
+            return jsonify(stats)
+        return Response(format_prometheus(stats), mimetype='text/plain; version=0.0.4')
+    
+    @app.route('/metrics/queries')
+    def metrics_queries():
+        if not app.config['QUERY_PROFILING']:
+            return jsonify({'error': 'Query profiling is disabled'}), 404
+        return jsonify(query_profiler.stats.report())
+    
+    # Kitchen display routes
+    @app.route('/api/kitchen/stream')
+    def api_kitchen_stream():
+        last_event_id = request.headers.get('Last-Event-ID', type=int)
+        response = Response(stream_with_context(kitchen_stream(last_event_id)), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+        return response
+    
+    @app.route('/api/kitchen/items/<int:item_id>/status', methods=['POST'])
+    @login_required
+    def api_kitchen_item_status(item_id):
+        data = request.json
+        
+        if not data or data.get('status') not in ITEM_STATUSES:
+            return jsonify({'error': 'Invalid status'}), 400
+        
+        order_item = OrderItem.query.get_or_404(item_id)
+        order_item.status = data['status']
+        order_api.touch_order(order_item.order_id)
+        
+        menu_item = get_catalog().by_id.get(order_item.menu_item_id)
+        item_data = item_event_data(
+            order_item, menu_item['name'] if menu_item else None, menu_item['category'] if menu_item else None
+        )
+        queue_event('item.status', item_data)
+        db.session.commit()
+        
+        return jsonify(item_data)
+    
+    @app.route('/api/kitchen/queue')
+    def api_kitchen_queue():
+        scheduler = kitchen_scheduler.get_scheduler()
+        station = request.args.get('station')
+        if not station:
+            return jsonify({'stations': scheduler.summary()})
+        
+        limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+        return jsonify({'station': station, 'groups': scheduler.peek(station, limit)})
+    
+    @app.route('/api/kitchen/stations/<station>/fire', methods=['POST'])
+    @login_required
+    def api_kitchen_fire(station):
+        fired = kitchen_scheduler.fire_next(station)
+        db.session.commit()
+        return jsonify({'fired': fired})
+    
     # API routes for POS system
     @app.route('/api/menu')
     def api_menu():
-        menu_items = MenuItem.query.filter_by(available=True).all()
-        menu_data = [{
+        catalog = get_catalog()
+        response = Response(catalog.api_json, mimetype='application/json')
+        response.set_etag(catalog.etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        
+        # Answers 304 Not Modified when the client's If-None-Match still matches
+        return response.make_conditional(request)
+    
+    @app.route('/api/reservations/availability')
+    def api_reservation_availability():
+        day = parse_date(request.args.get('date'))
+        at = reservation_index.parse_time(request.args.get('time'))
+        party_size = request.args.get('party_size', type=int)
+        
+        if not day or not at or not party_size or party_size < 1:
+            return jsonify({'error': 'date (YYYY-MM-DD), time (HH:MM) and party_size are required'}), 400
+        
+        tables = reservation_index.find_available_tables(
+            day, at, party_size, ignore_id=request.args.get('ignore_id', type=int)
+        )
+        return jsonify({
+            'date': day.isoformat(),
+            'time': at.strftime('%H:%M'),
+            'party_size': party_size,
+            'seating_minutes': reservation_index.seating_minutes(party_size),
+            'tables': tables
+        })
+    
+    @app.route('/api/menu/<int:id>/recipe', methods=['GET', 'PUT'])
+    @login_required
+    def api_menu_recipe(id):
+        menu_item = MenuItem.query.get_or_404(id)
+        
+        if request.method == 'PUT':
+            data = request.json
+            lines = data.get('ingredients') if isinstance(data, dict) else None
+            if not isinstance(lines, list):
+                return jsonify({'error': 'Invalid data'}), 400
+            try:
+                wanted = {int(line['inventory_id']): float(line['quantity']) for line in lines}
+            except (KeyError, TypeError, ValueError):
+                return jsonify({'error': 'Each ingredient needs inventory_id and quantity'}), 400
+            if any(quantity <= 0 for quantity in wanted.values()):
+                return jsonify({'error': 'Ingredient quantities must be positive'}), 400
+            
+            known = {i.id for i in Inventory.query.filter(Inventory.id.in_(wanted)).all()} if wanted else set()
+            if known != set(wanted):
+                return jsonify({'error': f'Unknown inventory ids: {sorted(set(wanted) - known)}'}), 400
+            
+            menu_item.recipe = [
+                RecipeIngredient(inventory_id=inventory_id, quantity=quantity)
+                for inventory_id, quantity in wanted.items()
+            ]
+            db.session.commit()
+        
+        return jsonify([{
+            'inventory_id': line.inventory_id,
+            'name': line.inventory.name,
+            'unit': line.inventory.unit,
+            'quantity': line.quantity
+        } for line in RecipeIngredient.query.options(joinedload(RecipeIngredient.inventory)).filter_by(menu_item_id=id)])
+    
+    @app.route('/api/inventory/low-stock')
+    def api_inventory_low_stock():
+        items = Inventory.query.filter(Inventory.quantity <= Inventory.reorder_level).order_by(Inventory.name).all()
+        return jsonify([{
             'id': item.id,
             'name': item.name,
-            'description': item.description,
-            'price': item.price,
-            'category': item.category,
-            'image_url': item.image_url
-        } for item in menu_items]
+            'quantity': item.quantity,
+            'unit': item.unit,
+            'reorder_level': item.reorder_level,
+            'supplier': item.supplier
+        } for item in items])
+    
+    @app.route('/api/reports/sales')
+    @login_required
+    def api_reports_sales():
+        group = request.args.get('group', 'day')
+        if group not in REPORT_GROUPS:
+            return jsonify({'error': f'group must be one of {", ".join(REPORT_GROUPS)}'}), 400
+        date_to = parse_date(request.args.get('date_to')) or date.today()
+        date_from = parse_date(request.args.get('date_from')) or date_to - timedelta(days=6)
+        if date_from > date_to or (date_to - date_from).days > 366:
+            return jsonify({'error': 'Date range must be between 1 and 367 days'}), 400
         
-        return jsonify(menu_data)
+        return jsonify({
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'group': group,
+            'rows': sales_report(date_from, date_to, group)
+        })
     
     @app.route('/api/tables')
     def api_tables():
-        tables = Table.query.all()
-        table_data = [{
-            'id': table.id,
-            'table_number': table.table_number,
-            'capacity': table.capacity,
-            'status': table.status
-        } for table in tables]
+        floor_map = table_state.get_floor_map()
+        response = Response(floor_map.api_json, mimetype='application/json')
+        response.set_etag(floor_map.etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+    
+    @app.route('/api/tables/<int:table_id>/status', methods=['POST'])
+    @login_required
+    def api_table_status(table_id):
+        data = request.get_json(silent=True) or {}
+        status = data.get('status')
+        if status not in table_state.TABLE_STATUSES:
+            return jsonify({'error': f"status must be one of {', '.join(table_state.TABLE_STATUSES)}"}), 400
+        if 'version' in data and not isinstance(data['version'], int):
+            return jsonify({'error': 'version must be an integer'}), 400
+        
+        # Without a version the change is still refused if the status moves underneath it
+        if not table_state.transition(table_id, status, expected_version=data.get('version')):
+            db.session.rollback()
+            table = db.session.get(Table, table_id)
+            if table is None:
+                return jsonify({'error': 'Table not found'}), 404
+            if status not in table_state.TRANSITIONS[table.status]:
+                error = f'A {table.status} table cannot be marked {status}'
+            else:
+                error = 'Table state changed; reload and retry'
+            return jsonify({
+                'error': error,
+                'status': table.status,
+                'version': table.version
+            }), 409
         
-        return jsonify(table_data)
+        db.session.commit()
+        table = db.session.get(Table, table_id)
+        return jsonify({'id': table.id, 'status': table.status, 'version': table.version})
     
     @app.route('/api/customers')
     def api_customers():
-        customers = Customer.query.all()
-        customer_data = [{
-            'id': customer.id,
-            'name': customer.name,
-            'email': customer.email,
-            'phone': customer.phone
-        } for customer in customers]
+        customer_data, page, per_page, has_next = search_customers(
+            request.args.get('q', ''),
+            page=request.args.get('page', type=int),
+            per_page=request.args.get('per_page', type=int)
+        )
+        
+        response = jsonify(customer_data)
+        if has_next:
+            next_url = url_for('api_customers', q=request.args.get('q') or None, page=page + 1, per_page=per_page)
+            response.headers['Link'] = f'<{next_url}>; rel="next"'
+        return response
+    
+    @app.route('/api/sync')
+    @login_required
+    def api_sync():
+        try:
+            if request.args.get('cursor'):
+                positions = delta_sync.decode_sync_cursor(request.args['cursor'])
+            else:
+                positions = delta_sync.initial_positions(order_api.parse_timestamp(request.args.get('since'), 'since'))
+        except (delta_sync.SyncCursorError, order_api.OrderQueryError) as e:
+            return jsonify({'error': str(e)}), 400
+        if delta_sync.needs_resync(positions):
+            return jsonify({
+                'error': 'Deletions since this cursor are no longer kept; sync again without cursor or since',
+                'resync': True
+            }), 410
+        
+        changes, positions, has_more = delta_sync.sync_changes(positions, request.args.get('limit', type=int))
+        return jsonify({
+            **changes,
+            'cursor': delta_sync.encode_sync_cursor(positions),
+            'has_more': has_more
+        })
+    
+    @app.errorhandler(delta_sync.TransactionTooLongError)
+    def sync_transaction_too_long(e):
+        db.session.rollback()
+        if request.path.startswith('/api/') or request.is_json:
+            return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
+        flash('The database was too busy to save your changes. Please try again.', 'warning')
+        return redirect(request.referrer or url_for('dashboard'))
+    
+    @app.route('/api/orders', methods=['GET'])
+    @login_required
+    def api_orders():
+        try:
+            fields = order_api.parse_fields(request.args.get('fields'))
+            include_items = order_api.parse_include(request.args.get('include'))
+            
+            # Batch lookup: ?ids=3,5,8
+            if request.args.get('ids'):
+                orders, missing = order_api.get_orders_by_id(
+                    order_api.parse_ids(request.args['ids']), fields, include_items
+                )
+                return jsonify({'orders': orders, 'missing': missing})
+            
+            orders, next_cursor = order_api.list_orders(
+                fields, include_items,
+                status=request.args.get('status'),
+                updated_since=order_api.parse_timestamp(request.args.get('updated_since')),
+                cursor=request.args.get('cursor'),
+                per_page=request.args.get('per_page', type=int)
+            )
+        except order_api.OrderQueryError as e:
+            return jsonify({'error': str(e)}), 400
         
-        return jsonify(customer_data)
+        return jsonify({'orders': orders, 'next_cursor': next_cursor})
+    
+    @app.route('/api/orders/<int:order_id>')
+    @login_required
+    def api_order(order_id):
+        try:
+            fields = order_api.parse_fields(request.args.get('fields'))
+            include_items = order_api.parse_include(request.args.get('include'))
+        except order_api.OrderQueryError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        orders, missing = order_api.get_orders_by_id([order_id], fields, include_items)
+        if missing:
+            return jsonify({'error': 'Order not found'}), 404
+        return jsonify(orders[0])
     
     @app.route('/api/orders', methods=['POST'])
     def api_create_order():
@@ -433,43 +845,34 @@ def register_routes(app):
         if not data or 'table_id' not in data or 'items' not in data:
             return jsonify({'error': 'Invalid data'}), 400
         
-        # Create new order
-        order = Order(
-            table_id=data['table_id'],
-            user_id=data.get('user_id', 1),  # Default to first user if not provided
-            customer_id=data.get('customer_id'),
-            status='pending'
-        )
-        db.session.add(order)
+        created, errors = ingest_tickets([data])
+        if not created:
+            db.session.rollback()
+            return jsonify({'error': errors[0]['error']}), 400
+        
         db.session.commit()
         
-        # Add order items
-        total_amount = 0
-        for item_data in data['items']:
-            menu_item = MenuItem.query.get(item_data['menu_item_id'])
-            if not menu_item:
-                continue
-                
-            quantity = item_data.get('quantity', 1)
-            order_item = OrderItem(
-                order_id=order.id,
-                menu_item_id=menu_item.id,
-                quantity=quantity,
-                price=menu_item.price,
-                notes=item_data.get('notes', '')
-            )
-            db.session.add(order_item)
-            total_amount += (menu_item.price * quantity)
+        order = created[0]
+        return jsonify({
+            'order_id': order['order_id'],
+            'total_amount': order['total_amount'],
+            'status': order['status']
+        }), 201
+    
+    @app.route('/api/orders/batch', methods=['POST'])
+    def api_create_orders_batch():
+        data = request.json
+        tickets = data.get('orders') if isinstance(data, dict) else None
         
-        # Update order total and table status
-        order.total_amount = total_amount
-        table = Table.query.get(data['table_id'])
-        table.status = 'occupied'
+        if not isinstance(tickets, list) or not tickets:
+            return jsonify({'error': 'Invalid data'}), 400
+        if len(tickets) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_BATCH_SIZE} orders per batch'}), 413
         
-        db.session.commit()
+        created, errors = ingest_tickets(tickets)
+        if not created:
+            db.session.rollback()
+            return jsonify({'created': [], 'errors': errors}), 400
         
-        return jsonify({
-            'order_id': order.id,
-            'total_amount': order.total_amount,
-            'status': order.status
-        }), 201
\ No newline at end of file
+        db.session.commit()
+        return jsonify({'created': created, 'errors': errors}), 201
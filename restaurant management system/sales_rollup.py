@@ -0,0 +1,188 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, literal, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from extensions import db
+from models import DailySales, MenuItem, Order, OrderItem
+
+REPORT_GROUPS = ('day', 'category', 'item')
+
+
+def _day_bounds(day):
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+def _upsert(rows):
+    """Add rows into daily_sales, incrementing existing (day, menu_item_id) counters"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'mysql':
+        stmt = mysql_insert(DailySales).values(rows)
+        stmt = stmt.on_duplicate_key_update(
+            quantity=DailySales.quantity + stmt.inserted.quantity,
+            revenue=DailySales.revenue + stmt.inserted.revenue,
+            order_count=DailySales.order_count + stmt.inserted.order_count
+        )
+        db.session.execute(stmt)
+    elif dialect == 'sqlite':
+        stmt = sqlite_insert(DailySales).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['day', 'menu_item_id'],
+            set_={
+                'quantity': DailySales.quantity + stmt.excluded.quantity,
+                'revenue': DailySales.revenue + stmt.excluded.revenue,
+                'order_count': DailySales.order_count + stmt.excluded.order_count
+            }
+        )
+        db.session.execute(stmt)
+    else:
+        # No native upsert: increment the rows that exist and insert the rest. Two
+        # transactions adding the same new (day, item) at once collide on
+        # uq_daily_sales_day_item, so one fails instead of a count being lost.
+        existing = set(db.session.execute(
+            select(DailySales.day, DailySales.menu_item_id).where(
+                DailySales.day.in_({row['day'] for row in rows}),
+                DailySales.menu_item_id.in_({row['menu_item_id'] for row in rows})
+            )
+        ).all())
+        inserts = []
+        for row in rows:
+            if (row['day'], row['menu_item_id']) not in existing:
+                inserts.append(row)
+                continue
+            db.session.execute(
+                update(DailySales)
+                .where(DailySales.day == row['day'], DailySales.menu_item_id == row['menu_item_id'])
+                .values(
+                    quantity=DailySales.quantity + row['quantity'],
+                    revenue=DailySales.revenue + row['revenue'],
+                    order_count=DailySales.order_count + row['order_count']
+                )
+                .execution_options(synchronize_session=False)
+            )
+        if inserts:
+            db.session.execute(insert(DailySales), inserts)
+
+
+def record_completed_order(order):
+    """Fold one newly completed order into the rollup, inside the caller's transaction"""
+    _fold_order(order, 1)
+
+
+def remove_completed_order(order):
+    """Take a completed order back out of the rollup, e.g. when it is cancelled afterwards"""
+    _fold_order(order, -1)
+
+
+def _fold_order(order, sign):
+    lines = db.session.execute(
+        select(
+            OrderItem.menu_item_id,
+            MenuItem.category,
+            func.sum(OrderItem.quantity).label('quantity'),
+            func.sum(OrderItem.price * OrderItem.quantity).label('revenue')
+        )
+        .join(MenuItem, MenuItem.id == OrderItem.menu_item_id)
+        .where(OrderItem.order_id == order.id)
+        .group_by(OrderItem.menu_item_id, MenuItem.category)
+    ).all()
+    if not lines:
+        return
+
+    day = (order.created_at or datetime.utcnow()).date()
+    _upsert([{
+        'day': day,
+        'menu_item_id': line.menu_item_id,
+        'category': line.category,
+        'quantity': sign * line.quantity,
+        'revenue': sign * line.revenue,
+        'order_count': sign
+    } for line in lines])
+
+
+def rebuild_day(day):
+    """Recompute one day of the rollup from raw orders (used by the backfill)"""
+    start, end = _day_bounds(day)
+    db.session.execute(delete(DailySales).where(DailySales.day == day))
+    aggregate = (
+        select(
+            literal(day).label('day'),
+            OrderItem.menu_item_id,
+            MenuItem.category,
+            func.sum(OrderItem.quantity),
+            func.sum(OrderItem.price * OrderItem.quantity),
+            func.count(func.distinct(OrderItem.order_id))
+        )
+        .join(Order, Order.id == OrderItem.order_id)
+        .join(MenuItem, MenuItem.id == OrderItem.menu_item_id)
+        .where(Order.status == 'completed', Order.created_at >= start, Order.created_at < end)
+        .group_by(OrderItem.menu_item_id, MenuItem.category)
+    )
+    db.session.execute(
+        insert(DailySales).from_select(
+            ['day', 'menu_item_id', 'category', 'quantity', 'revenue', 'order_count'], aggregate
+        )
+    )
+
+
+def backfill(date_from, date_to):
+    """Rebuild every day in [date_from, date_to], committing one day at a time"""
+    days = 0
+    day = date_from
+    while day <= date_to:
+        rebuild_day(day)
+        db.session.commit()
+        days += 1
+        day += timedelta(days=1)
+    return days
+
+
+def sales_report(date_from, date_to, group='day'):
+    """Trend data from the rollup: a few hundred rows instead of every order line"""
+    filters = (DailySales.day >= date_from, DailySales.day <= date_to)
+    totals = (
+        func.sum(DailySales.quantity).label('quantity'),
+        func.sum(DailySales.revenue).label('revenue'),
+    )
+    if group == 'category':
+        rows = db.session.execute(
+            select(DailySales.category, *totals).where(*filters)
+            .group_by(DailySales.category).order_by(func.sum(DailySales.revenue).desc())
+        ).all()
+        return [{'category': r.category, 'quantity': int(r.quantity), 'revenue': float(r.revenue)} for r in rows]
+    if group == 'item':
+        rows = db.session.execute(
+            select(DailySales.menu_item_id, MenuItem.name, DailySales.category, *totals,
+                   func.sum(DailySales.order_count).label('order_count'))
+            .join(MenuItem, MenuItem.id == DailySales.menu_item_id)
+            .where(*filters)
+            .group_by(DailySales.menu_item_id, MenuItem.name, DailySales.category)
+            .order_by(func.sum(DailySales.revenue).desc())
+        ).all()
+        return [{
+            'menu_item_id': r.menu_item_id,
+            'name': r.name,
+            'category': r.category,
+            'quantity': int(r.quantity),
+            'revenue': float(r.revenue),
+            'order_count': int(r.order_count)
+        } for r in rows]
+
+    rows = db.session.execute(
+        select(DailySales.day, *totals).where(*filters).group_by(DailySales.day)
+    ).all()
+    by_day = {r.day: r for r in rows}
+    # Fill gaps so charts get one point per day
+    series = []
+    day = date_from
+    while day <= date_to:
+        r = by_day.get(day)
+        series.append({
+            'day': day.isoformat(),
+            'quantity': int(r.quantity) if r else 0,
+            'revenue': float(r.revenue) if r else 0.0
+        })
+        day += timedelta(days=1)
+    return series
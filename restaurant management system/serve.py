@@ -0,0 +1,72 @@
+import os
+
+from sqlalchemy.orm import configure_mappers
+
+from extensions import db
+from template_cache import precompile_templates
+
+
+def server_options_from_env():
+    """gunicorn settings from SERVE_* environment variables"""
+    return {
+        'bind': os.getenv('SERVE_BIND', '0.0.0.0:8000'),
+        # Each worker is a process with its own caches and DB pool (DB_POOL_SIZE + DB_MAX_OVERFLOW connections).
+        # Kitchen display streams and the station queues live in one process, so a second worker's screens
+        # would miss events raised in the first; raise this only without kitchen displays
+        'workers': int(os.getenv('SERVE_WORKERS', '1')),
+        # Threads per worker; kitchen display streams each hold one for as long as the screen is open
+        'threads': int(os.getenv('SERVE_THREADS', '4')),
+        'timeout': int(os.getenv('SERVE_TIMEOUT', '30')),
+        'graceful_timeout': int(os.getenv('SERVE_GRACEFUL_TIMEOUT', '30')),
+        # Recycle workers now and then to cap slow leaks; jitter keeps them from restarting together
+        'max_requests': int(os.getenv('SERVE_MAX_REQUESTS', '0')),
+        'max_requests_jitter': int(os.getenv('SERVE_MAX_REQUESTS_JITTER', '0')),
+    }
+
+
+def preload(app):
+    """Do the per-process startup work once, in the master, before workers fork.
+
+    Mappers are configured and every template is compiled, so forked workers
+    share those pages copy-on-write instead of each paying for them on their
+    first requests. Connections opened along the way are closed again: a
+    socket inherited by several processes would be used by all of them.
+    """
+    configure_mappers()
+    precompile_templates(app)
+    with app.app_context():
+        db.engine.dispose()
+
+
+def after_fork(app):
+    # Forget any pooled connections copied from the master without closing the master's sockets
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def run(app, **overrides):
+    """Serve the app with gunicorn: preloaded master, gthread workers"""
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise RuntimeError('gunicorn is not installed (pip install gunicorn); it runs on Linux and macOS only')
+
+    options = server_options_from_env()
+    options.update({key: value for key, value in overrides.items() if value is not None})
+    options.update({
+        'preload_app': True,
+        'worker_class': 'gthread' if options['threads'] > 1 else 'sync',
+        'post_fork': lambda server, worker: after_fork(app),
+        'accesslog': os.getenv('SERVE_ACCESS_LOG', '-') or None,
+    })
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            preload(app)
+            return app
+
+    Server().run()
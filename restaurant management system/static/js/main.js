@@ -32,16 +32,23 @@ document.addEventListener('DOMContentLoaded', function() {
         document.querySelector('.order-total').textContent = '$' + total.toFixed(2);
     }
     
-    // Dashboard charts initialization (if Chart.js is included)
-    if (typeof Chart !== 'undefined' && document.getElementById('salesChart')) {
-        const ctx = document.getElementById('salesChart').getContext('2d');
+    // Dashboard charts initialization (if Chart.js is included), fed by the daily sales rollup
+    const salesCanvas = document.getElementById('salesChart');
+    if (typeof Chart !== 'undefined' && salesCanvas) {
+        fetch(salesCanvas.dataset.source)
+            .then(response => response.json())
+            .then(report => renderSalesChart(salesCanvas, report.rows));
+    }
+    
+    function renderSalesChart(canvas, rows) {
+        const ctx = canvas.getContext('2d');
         const salesChart = new Chart(ctx, {
             type: 'line',
             data: {
-                labels: ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+                labels: rows.map(row => new Date(row.day + 'T00:00:00').toLocaleDateString(undefined, { weekday: 'long' })),
                 datasets: [{
                     label: 'Sales ($)',
-                    data: [1200, 1900, 1500, 2000, 2500, 3000, 2800],
+                    data: rows.map(row => row.revenue),
                     backgroundColor: 'rgba(0, 123, 255, 0.1)',
                     borderColor: 'rgba(0, 123, 255, 1)',
                     borderWidth: 2,
@@ -0,0 +1,67 @@
+import hashlib
+import os
+import threading
+
+from flask import request
+from werkzeug.security import safe_join
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class AssetFingerprints:
+    """Content hash per static file, recomputed only when the file's mtime or size changes"""
+
+    def __init__(self, static_folder):
+        self.static_folder = static_folder
+        self._lock = threading.Lock()
+        self._hashes = {}  # filename -> (mtime_ns, size, hash)
+
+    def get(self, filename):
+        path = safe_join(self.static_folder, filename)
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        entry = self._hashes.get(filename)
+        if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            return entry[2]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        with self._lock:
+            self._hashes[filename] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def preload(self):
+        for root, _, files in os.walk(self.static_folder):
+            for name in files:
+                self.get(os.path.relpath(os.path.join(root, name), self.static_folder).replace(os.sep, '/'))
+
+
+def init_static_assets(app):
+    """Fingerprint url_for('static', ...) URLs with ?v=<content hash>.
+
+    A request carrying the file's current hash can be cached forever, since a
+    changed file gets a new URL; plain static URLs keep Flask's revalidation.
+    """
+    fingerprints = AssetFingerprints(app.static_folder)
+    fingerprints.preload()
+    app.extensions['static_fingerprints'] = fingerprints
+
+    @app.url_defaults
+    def fingerprint_static_url(endpoint, values):
+        if endpoint == 'static' and 'v' not in values:
+            digest = fingerprints.get(values.get('filename', ''))
+            if digest:
+                values['v'] = digest
+
+    @app.after_request
+    def cache_fingerprinted_assets(response):
+        if (
+            request.endpoint == 'static' and response.status_code == 200
+            and request.args.get('v')
+            and request.args['v'] == fingerprints.get(request.view_args.get('filename', ''))
+        ):
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
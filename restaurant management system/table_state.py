@@ -0,0 +1,187 @@
+import hashlib
+import json
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import event, exists, select, update
+
+from extensions import db
+from models import Order, Table
+
+TABLE_STATUSES = ('available', 'occupied', 'reserved')
+
+# Allowed status changes; anything else is refused
+TRANSITIONS = {
+    'available': ('occupied', 'reserved'),
+    'reserved': ('available', 'occupied'),
+    'occupied': ('available',),
+}
+
+# Orders that still keep their table occupied
+OPEN_ORDER_STATUSES = ('pending', 'preparing', 'served')
+
+_lock = threading.Lock()
+_version = 0
+_floor_map = None
+
+
+def _sources(to_status):
+    return [status for status, targets in TRANSITIONS.items() if to_status in targets]
+
+
+def _changed():
+    db.session.info['floor_map_changed'] = True
+
+
+def transition(table_id, to_status, expected_version=None):
+    """Compare-and-set a table's status; returns False if another terminal got there first.
+
+    The UPDATE only matches while the table is in a state that may move to
+    `to_status` (and, if given, still at `expected_version`), so concurrent
+    requests never need a shared lock: exactly one of them changes the row.
+    """
+    conditions = [Table.id == table_id, Table.status.in_(_sources(to_status))]
+    if expected_version is not None:
+        conditions.append(Table.version == expected_version)
+    result = db.session.execute(
+        update(Table)
+        .where(*conditions)
+        .values(status=to_status, version=Table.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+    _changed()
+    return True
+
+
+def seat_table(table_id):
+    """Mark a free or reserved table occupied for a new order"""
+    return transition(table_id, 'occupied')
+
+
+def occupy_tables(table_ids):
+    """Mark tables occupied for POS tickets; tickets for an already occupied table just add to it"""
+    table_ids = set(table_ids)
+    if not table_ids:
+        return
+    db.session.execute(
+        update(Table)
+        .where(Table.id.in_(table_ids), Table.status.in_(_sources('occupied')))
+        .values(status='occupied', version=Table.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    _changed()
+
+
+def lock_table(table_id):
+    """Lock one table row so orders closing on the same table release it one after another.
+
+    Call before changing the order's status; only requests for this table wait.
+    """
+    db.session.execute(select(Table.id).where(Table.id == table_id).with_for_update())
+
+
+def release_table(table_id):
+    """Free an occupied table once none of its orders are still open.
+
+    The open-order check runs inside the UPDATE, so a table with another
+    open order stays occupied. Returns True if the table was freed.
+    """
+    db.session.flush()
+    result = db.session.execute(
+        update(Table)
+        .where(
+            Table.id == table_id,
+            Table.status == 'occupied',
+            ~exists().where(Order.table_id == table_id, Order.status.in_(OPEN_ORDER_STATUSES))
+        )
+        .values(status='available', version=Table.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+    _changed()
+    return True
+
+
+def update_table(table_id, expected_version, **values):
+    """Save an edit made against `expected_version`; False if the table changed meanwhile"""
+    result = db.session.execute(
+        update(Table)
+        .where(Table.id == table_id, Table.version == expected_version)
+        .values(version=Table.version + 1, **values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+    _changed()
+    return True
+
+
+def table_added():
+    _changed()
+
+
+class FloorMap:
+    """Snapshot of every table's status for floor plan screens"""
+
+    def __init__(self, version, tables):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.tables = tables
+        self.available = [t for t in tables if t['status'] == 'available']
+        self.api_json = json.dumps(tables, separators=(',', ':')).encode('utf-8')
+        self.etag = hashlib.sha1(self.api_json).hexdigest()
+
+
+def _load_tables():
+    rows = db.session.execute(
+        select(Table.id, Table.table_number, Table.capacity, Table.status, Table.version)
+        .order_by(Table.table_number)
+    ).all()
+    return [{
+        'id': row.id,
+        'table_number': row.table_number,
+        'capacity': row.capacity,
+        'status': row.status,
+        'version': row.version
+    } for row in rows]
+
+
+def get_floor_map():
+    """Return the current floor map, rebuilt after local changes or once FLOOR_MAP_TTL runs out.
+
+    Status changes are always decided by the database, so a stale map can only
+    show a table in the wrong colour for a moment, never double-seat it.
+    """
+    global _floor_map
+    ttl = current_app.config.get('FLOOR_MAP_TTL', 0)
+    with _lock:
+        floor_map, version = _floor_map, _version
+    if floor_map and floor_map.version == version and time.monotonic() - floor_map.built_at < ttl:
+        return floor_map
+
+    floor_map = FloorMap(version, _load_tables())
+    with _lock:
+        if _floor_map is None or _floor_map.version <= floor_map.version:
+            _floor_map = floor_map
+    return floor_map
+
+
+def invalidate_floor_map():
+    global _version
+    with _lock:
+        _version += 1
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('floor_map_changed', False):
+        invalidate_floor_map()
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_changes(session, previous_transaction):
+    session.info.pop('floor_map_changed', None)
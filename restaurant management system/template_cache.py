@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+
+
+class FragmentCache:
+    """Bounded LRU of rendered template fragments"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> Markup
+
+    def get(self, key):
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+            return fragment
+
+    def put(self, key, fragment):
+        with self._lock:
+            self._entries[key] = fragment
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class FragmentCacheExtension(Extension):
+    """{% cache key, ... %}...{% endcache %} renders the body once per distinct key.
+
+    Keys must name everything the body shows, typically a row's id and
+    updated_at; a changed row then gets a new key and its old fragment ages
+    out of the LRU, so nothing needs invalidating and worker processes can't
+    serve each other's stale rows. MySQL keeps updated_at to the second, so
+    values that can change twice within one (order status, table version)
+    belong in the key too. Bodies must not depend on the session or user
+    (no csrf_token()). Skipped while templates auto-reload in debug mode.
+    """
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        # The template name and line keep two {% cache %} blocks with the same key apart
+        parts = [nodes.Const(parser.name), nodes.Const(lineno), parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', [nodes.Tuple(parts, 'load')]), [], [], body).set_lineno(lineno)
+
+    def _render(self, key, caller):
+        cache = self.environment.fragment_cache
+        if cache is None or self.environment.auto_reload:
+            return caller()
+        fragment = cache.get(key)
+        if fragment is None:
+            fragment = caller()
+            cache.put(key, fragment)
+        return fragment
+
+
+def init_template_cache(app):
+    """Enable {% cache %} fragments and a compiled-template bytecode cache.
+
+    Compiled templates are written to TEMPLATE_CACHE_DIR (the system temp
+    directory when unset), so workers and restarts load them instead of
+    parsing every template again.
+    """
+    env = app.jinja_env
+    env.add_extension(FragmentCacheExtension)
+    if app.config['FRAGMENT_CACHE_SIZE'] > 0:
+        env.fragment_cache = FragmentCache(app.config['FRAGMENT_CACHE_SIZE'])
+    env.bytecode_cache = FileSystemBytecodeCache(app.config['TEMPLATE_CACHE_DIR'])
+
+
+def precompile_templates(app):
+    """Compile every template up front (and fill the bytecode cache); returns how many"""
+    names = app.jinja_env.list_templates()
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
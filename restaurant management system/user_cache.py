@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from flask_login import UserMixin
+from sqlalchemy import event, select
+
+from extensions import db, login_manager
+from models import User
+
+
+class CachedUser(UserMixin):
+    """Read-only copy of the User columns a request needs, safe to share between requests"""
+
+    def __init__(self, id, username, email, role):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.role = role
+
+    def __repr__(self):
+        return f'<User {self.username}>'
+
+
+class UserCache:
+    """Bounded LRU of users with a TTL per entry"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # user_id -> (expires_at, CachedUser)
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def put(self, user, ttl, max_size):
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + ttl, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+cache = UserCache()
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    """Return the logged-in user, hitting the database at most once per USER_CACHE_TTL.
+
+    Changes made in this process drop the entry on commit; password, role or
+    deletion changes made by other worker processes apply within the TTL.
+    """
+    user_id = int(user_id)
+    user = cache.get(user_id)
+    if user is not None:
+        return user
+
+    row = db.session.execute(
+        select(User.id, User.username, User.email, User.role).where(User.id == user_id)
+    ).first()
+    if row is None:
+        return None
+    user = CachedUser(row.id, row.username, row.email, row.role)
+    ttl = current_app.config.get('USER_CACHE_TTL', 0)
+    if ttl > 0:
+        cache.put(user, ttl, current_app.config.get('USER_CACHE_SIZE', 1000))
+    return user
+
+
+@event.listens_for(db.session, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    changed = {obj.id for obj in list(session.dirty) + list(session.deleted) if isinstance(obj, User)}
+    if changed:
+        session.info.setdefault('changed_users', set()).update(changed)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_changed_users(session):
+    changed = session.info.pop('changed_users', None)
+    if changed:
+        cache.invalidate(changed)
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_changed_users(session, previous_transaction):
+    session.info.pop('changed_users', None)
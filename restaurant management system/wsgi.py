@@ -0,0 +1,6 @@
+# Production entry point: gunicorn wsgi:app (or `flask --app app serve`, which adds the worker settings)
+from app import create_app
+from serve import preload
+
+app = create_app()
+preload(app)